@@ -1,11 +1,20 @@
+from array import array
 from contextlib import closing, suppress
-from dataclasses import dataclass
-from itertools import islice
+from dataclasses import dataclass, field
+from itertools import chain, count, islice, repeat
 from random import shuffle
 from sqlite3 import Connection, OperationalError
 from sqlite3.dbapi2 import Cursor
-from typing import AbstractSet, Iterator, Mapping, Optional, Sequence, Tuple
-from uuid import uuid4
+from typing import (
+    AbstractSet,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 from pynvim_pp.lib import recode
 
@@ -14,6 +23,8 @@ from ....databases.types import DB
 from ....shared.parse import coalesce
 from ....shared.settings import MatchOptions
 from ....shared.sql import BIGGEST_INT, init_db, like_esc
+from .index import WordIndex
+from .positions import Positions
 from .sql import sql
 
 
@@ -48,6 +59,26 @@ def _ensure_buffer(cursor: Cursor, buf_id: int, filetype: str, filename: str) ->
         cursor.execute(sql("insert", "buffer"), row)
 
 
+@dataclass
+class _Lines:
+    """
+    Line order is kept here, not in sqlite, so edits never renumber the rows below
+    """
+
+    ids: MutableSequence[int]
+    hashes: MutableSequence[int]
+    positions: Positions = field(default_factory=Positions)
+
+
+_SCHEMA = 2
+_NIL = 0
+_LINE_IDS = count(_NIL + 1)
+# Never matches a line, so lines cut off by `tokenization_limit` are retried
+_UNTOKENIZED = hash(None)
+# Lines dropped before orphaned `vocab` is collected
+_VOCAB_GC = 1000
+
+
 def _setlines(
     cursor: Cursor,
     unifying_chars: AbstractSet[str],
@@ -56,18 +87,42 @@ def _setlines(
     buf_id: int,
     filetype: str,
     filename: str,
+    buf: _Lines,
     lo: int,
     hi: int,
     lines: Sequence[str],
-) -> None:
-    def m0() -> Iterator[Tuple[int, str, bytes]]:
-        for line_num, line in enumerate(lines, start=lo):
-            line_id = uuid4().bytes
-            yield line_num, recode(line), line_id
+    tokens: Optional[Sequence[str]],
+) -> int:
+    """
+    Returns the number of lines dropped
+    """
+
+    if (pad := lo - len(buf.ids)) > 0:
+        end = len(buf.ids)
+        buf.positions.splice(buf.ids, lo=end, hi=end, new=array("q", repeat(_NIL, pad)))
+        buf.ids.extend(repeat(_NIL, pad))
+        buf.hashes.extend(repeat(hash(""), pad))
+
+    pool: MutableMapping[int, MutableSequence[int]] = {}
+    for line_id, line_hash in zip(buf.ids[lo:hi], buf.hashes[lo:hi]):
+        pool.setdefault(line_hash, []).append(line_id)
+
+    new_ids, new_hashes = array("q"), array("q")
+    line_info: MutableSequence[Tuple[int, str, int]] = []
+    for line_num, line in enumerate(lines, start=lo):
+        line_hash = hash(line)
+        if reuse := pool.get(line_hash):
+            line_id = reuse.pop()
+        else:
+            line_id = next(_LINE_IDS)
+            line_info.append((line_num, recode(line), line_id))
+        new_ids.append(line_id)
+        new_hashes.append(line_hash)
 
-    line_info = [*m0()]
     shuffle(line_info)
 
+    dropped = tuple(chain.from_iterable(pool.values()))
+
     def m1() -> Iterator[Mapping]:
         for line_num, line, line_id in line_info:
             yield {
@@ -77,15 +132,27 @@ def _setlines(
                 "line": line if DEBUG else "",
             }
 
-    def m2() -> Iterator[Mapping]:
-        for line_num, line, line_id in line_info:
-            for word in coalesce(
+    def tokenize(line_num: int, line: str) -> Iterator[str]:
+        return (
+            iter(tokens[line_num - lo].split())
+            if tokens
+            else coalesce(
                 unifying_chars,
                 include_syms=include_syms,
                 backwards=None,
                 chars=line,
-            ):
-                yield {"line_id": line_id, "word": word, "line_num": line_num}
+            )
+        )
+
+    occurrences: MutableSequence[Mapping] = []
+    budget = tokenization_limit
+    for line_num, line, line_id in line_info:
+        words = tokenize(line_num, line=line)
+        taken = tuple(islice(words, budget))
+        budget -= len(taken)
+        occurrences.extend({"line_id": line_id, "word": word} for word in taken)
+        if next(words, None) is not None:
+            new_hashes[line_num - lo] = _UNTOKENIZED
 
     _ensure_buffer(
         cursor,
@@ -93,34 +160,28 @@ def _setlines(
         filetype=filetype,
         filename=filename,
     )
-    cursor.execute(
-        sql("delete", "lines"),
-        {"buffer_id": buf_id, "lo": lo, "hi": hi},
-    )
-    shift = len(lines) - (hi - lo)
-    cursor.execute(
-        sql("update", "lines_shift_1"),
-        {"buffer_id": buf_id, "lo": lo, "shift": shift},
-    )
-    cursor.execute(sql("update", "lines_shift_2"), {"buffer_id": buf_id})
+    cursor.executemany(sql("delete", "line"), ({"rowid": i} for i in dropped))
+    buf.positions.splice(buf.ids, lo=lo, hi=hi, new=new_ids)
+    buf.ids[lo:hi], buf.hashes[lo:hi] = new_ids, new_hashes
     with suppress(UnicodeEncodeError):
         cursor.executemany(sql("insert", "line"), m1())
     with suppress(UnicodeEncodeError):
-        cursor.executemany(sql("insert", "word"), islice(m2(), tokenization_limit))
-    cursor.execute(sql("select", "line_count"), {"buffer_id": buf_id})
-    count = cursor.fetchone()["line_count"]
-    if not count:
-        cursor.execute(
-            sql("insert", "line"),
-            {"rowid": uuid4().bytes, "line": "", "buffer_id": buf_id, "line_num": 0},
-        )
+        cursor.executemany(sql("insert", "vocab"), occurrences)
+        cursor.executemany(sql("insert", "occurrence"), occurrences)
+    return len(dropped)
 
 
 def _init() -> Connection:
     conn = Connection(BUFFER_DB, isolation_level=None)
     init_db(conn)
     conn.executescript(sql("create", "pragma"))
+    (version,) = conn.execute("PRAGMA user_version").fetchone()
+    if version < _SCHEMA:
+        conn.executescript(sql("create", "migrate"))
     conn.executescript(sql("create", "tables"))
+    conn.execute(f"PRAGMA user_version = {_SCHEMA}")
+    # Line order is not persisted, lines from a previous session are meaningless
+    conn.execute(sql("delete", "buffers"))
     return conn
 
 
@@ -130,39 +191,73 @@ class BDB(DB):
         tokenization_limit: int,
         unifying_chars: AbstractSet[str],
         include_syms: bool,
+        memory_index: bool,
     ) -> None:
         self._tokenization_limit = tokenization_limit
         self._unifying_chars = unifying_chars
         self._include_syms = include_syms
+        self._index = (
+            WordIndex(
+                tokenization_limit,
+                unifying_chars=unifying_chars,
+                include_syms=include_syms,
+            )
+            if memory_index
+            else None
+        )
+        self._lines: MutableMapping[int, _Lines] = {}
+        self._dropped = 0
         self._conn = _init()
 
+    def _buf(self, buf_id: int) -> _Lines:
+        if not (buf := self._lines.get(buf_id)):
+            buf = self._lines[buf_id] = _Lines(ids=array("q"), hashes=array("q"))
+        return buf
+
     def vacuum(self, live_bufs: Mapping[int, int]) -> None:
-        with suppress(OperationalError):
-            with self._conn, closing(self._conn.cursor()) as cursor:
-                cursor.execute(sql("select", "buffers"), ())
-                existing = {row["rowid"] for row in cursor.fetchall()}
-                dead = existing - live_bufs.keys()
-                cursor.executemany(
-                    sql("delete", "buffer"),
-                    ({"buffer_id": buf_id} for buf_id in dead),
-                )
-                cursor.executemany(
-                    sql("delete", "lines"),
-                    (
-                        {"buffer_id": buf_id, "lo": line_count, "hi": -1}
-                        for buf_id, line_count in live_bufs.items()
-                    ),
-                )
-                cursor.execute("PRAGMA optimize", ())
+        if self._index:
+            self._index.vacuum(live_bufs)
+        else:
+            with suppress(OperationalError):
+                with self._conn, closing(self._conn.cursor()) as cursor:
+                    cursor.execute(sql("select", "buffers"), ())
+                    existing = {row["rowid"] for row in cursor.fetchall()}
+                    dead = existing - live_bufs.keys()
+                    cursor.executemany(
+                        sql("delete", "buffer"),
+                        ({"buffer_id": buf_id} for buf_id in dead),
+                    )
+                    for buf_id in dead:
+                        self._lines.pop(buf_id, None)
+
+                    for buf_id, line_count in live_bufs.items():
+                        if buf := self._lines.get(buf_id):
+                            dead_lines = buf.ids[line_count:]
+                            self._dropped += len(dead_lines)
+                            cursor.executemany(
+                                sql("delete", "line"),
+                                ({"rowid": line_id} for line_id in dead_lines),
+                            )
+                            buf.positions.splice(
+                                buf.ids, lo=line_count, hi=len(buf.ids), new=()
+                            )
+                            del buf.ids[line_count:], buf.hashes[line_count:]
+                    if dead or self._dropped >= _VOCAB_GC:
+                        cursor.execute(sql("delete", "vocab"), ())
+                        self._dropped = 0
+                    cursor.execute("PRAGMA optimize", ())
 
     def buf_update(self, buf_id: int, filetype: str, filename: str) -> None:
-        with self._conn, closing(self._conn.cursor()) as cursor:
-            _ensure_buffer(
-                cursor,
-                buf_id=buf_id,
-                filetype=filetype,
-                filename=filename,
-            )
+        if self._index:
+            self._index.buf_update(buf_id, filetype=filetype, filename=filename)
+        else:
+            with self._conn, closing(self._conn.cursor()) as cursor:
+                _ensure_buffer(
+                    cursor,
+                    buf_id=buf_id,
+                    filetype=filetype,
+                    filename=filename,
+                )
 
     def set_lines(
         self,
@@ -172,24 +267,43 @@ class BDB(DB):
         lo: int,
         hi: int,
         lines: Sequence[str],
+        tokens: Optional[Sequence[str]],
     ) -> None:
-        with suppress(OperationalError):
-            with self._conn, closing(self._conn.cursor()) as cursor:
-                _setlines(
-                    cursor,
-                    unifying_chars=self._unifying_chars,
-                    tokenization_limit=self._tokenization_limit,
-                    include_syms=self._include_syms,
-                    buf_id=buf_id,
-                    filetype=filetype,
-                    filename=filename,
-                    lo=lo,
-                    hi=hi,
-                    lines=lines,
-                )
+        """
+        `tokens`, from `tokenize_lines`, saves tokenizing `lines` here
+        """
 
-    def words(
+        if self._index:
+            self._index.set_lines(
+                buf_id,
+                filetype=filetype,
+                filename=filename,
+                lo=lo,
+                hi=hi,
+                lines=lines,
+                tokens=tokens,
+            )
+        else:
+            with suppress(OperationalError):
+                with self._conn, closing(self._conn.cursor()) as cursor:
+                    self._dropped += _setlines(
+                        cursor,
+                        unifying_chars=self._unifying_chars,
+                        tokenization_limit=self._tokenization_limit,
+                        include_syms=self._include_syms,
+                        buf_id=buf_id,
+                        filetype=filetype,
+                        filename=filename,
+                        buf=self._buf(buf_id),
+                        lo=lo,
+                        hi=hi,
+                        lines=lines,
+                        tokens=tokens,
+                    )
+
+    def _index_words(
         self,
+        index: WordIndex,
         opts: MatchOptions,
         filetype: Optional[str],
         word: str,
@@ -197,22 +311,52 @@ class BDB(DB):
         limitless: int,
         update: Optional[Update],
     ) -> Iterator[BufferWord]:
+        if update:
+            index.set_lines(
+                update.buf_id,
+                filetype=update.filetype,
+                filename=update.filename,
+                lo=update.lo,
+                hi=update.hi,
+                lines=update.lines,
+                tokens=None,
+            )
+        for indexed in index.words(
+            opts,
+            filetype=filetype,
+            word=word,
+            sym=sym,
+            limit=BIGGEST_INT if limitless else opts.max_results,
+        ):
+            yield BufferWord(
+                text=indexed.text,
+                filetype=indexed.filetype,
+                filename=indexed.filename,
+                line_num=indexed.line_num,
+            )
+
+    def _sql_words(
+        self,
+        opts: MatchOptions,
+        filetype: Optional[str],
+        word: str,
+        sym: str,
+        limitless: int,
+        update: Optional[Update],
+    ) -> Iterator[BufferWord]:
+        if update:
+            self.set_lines(
+                update.buf_id,
+                filetype=update.filetype,
+                filename=update.filename,
+                lo=update.lo,
+                hi=update.hi,
+                lines=update.lines,
+                tokens=None,
+            )
+
         with suppress(OperationalError):
             with self._conn, closing(self._conn.cursor()) as cursor:
-                if update:
-                    _setlines(
-                        cursor,
-                        unifying_chars=self._unifying_chars,
-                        tokenization_limit=self._tokenization_limit,
-                        include_syms=self._include_syms,
-                        buf_id=update.buf_id,
-                        filetype=update.filetype,
-                        filename=update.filename,
-                        lo=update.lo,
-                        hi=update.hi,
-                        lines=update.lines,
-                    )
-
                 cursor.execute(
                     sql("select", "words"),
                     {
@@ -227,9 +371,43 @@ class BDB(DB):
                     },
                 )
                 for row in cursor:
+                    buf = self._buf(row["buffer_id"])
+                    # `line_num` in sqlite is only accurate as of insertion
+                    line_num = buf.positions.get(buf.ids, line_id=row["line_id"])
+                    if line_num is None:
+                        line_num = row["line_num"]
                     yield BufferWord(
                         text=row["word"],
                         filetype=row["filetype"],
                         filename=row["filename"],
-                        line_num=row["line_num"] + 1,
+                        line_num=line_num + 1,
                     )
+
+    def words(
+        self,
+        opts: MatchOptions,
+        filetype: Optional[str],
+        word: str,
+        sym: str,
+        limitless: int,
+        update: Optional[Update],
+    ) -> Iterator[BufferWord]:
+        if self._index:
+            return self._index_words(
+                self._index,
+                opts=opts,
+                filetype=filetype,
+                word=word,
+                sym=sym,
+                limitless=limitless,
+                update=update,
+            )
+        else:
+            return self._sql_words(
+                opts,
+                filetype=filetype,
+                word=word,
+                sym=sym,
+                limitless=limitless,
+                update=update,
+            )
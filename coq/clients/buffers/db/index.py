@@ -0,0 +1,335 @@
+from array import array
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from itertools import chain, count, islice, repeat
+from random import shuffle
+from typing import (
+    AbstractSet,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    MutableSet,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from ....shared.fuzzy import quick_ratio
+from ....shared.parse import coalesce, lower
+from ....shared.settings import MatchOptions
+from .positions import Positions
+
+_MERGE_THRESHOLD = 4096
+_NIL = 0
+_LINE_IDS = count(_NIL + 1)
+# Never matches a line, so lines cut off by `tokenization_limit` are retried
+_UNTOKENIZED = hash(None)
+
+
+@dataclass(frozen=True)
+class IndexedWord:
+    text: str
+    filetype: str
+    filename: str
+    line_num: int
+
+
+@dataclass
+class _Buf:
+    filetype: str
+    filename: str
+    lines: MutableSequence[Sequence[str]]
+    hashes: MutableSequence[int]
+    ids: MutableSequence[int]
+    positions: Positions = field(default_factory=Positions)
+
+
+@dataclass
+class _Ref:
+    count: int
+    line_id: int
+    hint: int
+
+
+def _locate(lines: Sequence[Sequence[str]], word: str, hint: int) -> Optional[int]:
+    """
+    Search outwards from the last known line, edits only shift lines by a little
+    """
+
+    for delta in range(len(lines)):
+        for idx in (hint - delta, hint + delta):
+            if 0 <= idx < len(lines) and word in lines[idx]:
+                return idx
+    return None
+
+
+class WordIndex:
+    """
+    In process alternative to the sqlite word bank
+
+    Sorted array of lowercased words for prefix search,
+    each word refcounted by the number of lines containing it, per buffer
+
+    New words land in a small sorted side array, merged into the main one in bulk.
+    Dead words are dropped lazily, on merge
+    """
+
+    def __init__(
+        self,
+        tokenization_limit: int,
+        unifying_chars: AbstractSet[str],
+        include_syms: bool,
+    ) -> None:
+        self._tokenization_limit = tokenization_limit
+        self._unifying_chars = unifying_chars
+        self._include_syms = include_syms
+
+        self._bufs: MutableMapping[int, _Buf] = {}
+        self._refs: MutableMapping[str, MutableMapping[int, _Ref]] = {}
+        self._cases: MutableMapping[str, MutableSet[str]] = {}
+        self._lwords: Sequence[str] = ()
+        self._pending: MutableSequence[str] = []
+
+    def _tokenize(
+        self, lines: Sequence[str], tokens: Optional[Sequence[str]]
+    ) -> Iterator[Tuple[Sequence[str], bool]]:
+        """
+        `False` for lines cut off by `tokenization_limit`
+        """
+
+        budget = self._tokenization_limit
+        for idx, line in enumerate(lines):
+            words = (
+                iter(tokens[idx].split())
+                if tokens
+                else coalesce(
+                    self._unifying_chars,
+                    include_syms=self._include_syms,
+                    backwards=None,
+                    chars=line,
+                )
+            )
+            taken = tuple(islice(words, budget))
+            budget -= len(taken)
+            uniq = tuple({word: None for word in taken if word})
+            yield uniq, next(words, None) is None
+
+    def _indexed(self, lword: str) -> bool:
+        for lwords in (self._lwords, self._pending):
+            idx = bisect_left(lwords, lword)
+            if idx < len(lwords) and lwords[idx] == lword:
+                return True
+        return False
+
+    def _merge(self, fresh: Sequence[str]) -> None:
+        if len(self._pending) + len(fresh) < _MERGE_THRESHOLD:
+            for lword in fresh:
+                insort(self._pending, lword)
+        else:
+            merged = sorted(chain(self._lwords, self._pending, fresh))
+            self._lwords = tuple(lword for lword in merged if lword in self._cases)
+            self._pending = []
+
+    def _incr(
+        self,
+        buf_id: int,
+        line_id: int,
+        line_num: int,
+        words: Sequence[str],
+        fresh: MutableSequence[str],
+    ) -> None:
+        for word in words:
+            if not (refs := self._refs.get(word)):
+                refs = self._refs[word] = {}
+                lword = lower(word)
+                cases = self._cases.setdefault(lword, set())
+                if not cases and not self._indexed(lword):
+                    fresh.append(lword)
+                cases.add(word)
+
+            if ref := refs.get(buf_id):
+                ref.count += 1
+            else:
+                refs[buf_id] = _Ref(count=1, line_id=line_id, hint=line_num)
+
+    def _decr(self, buf_id: int, words: Sequence[str]) -> None:
+        for word in words:
+            refs = self._refs.get(word, {})
+            if ref := refs.get(buf_id):
+                ref.count -= 1
+                if ref.count <= 0:
+                    refs.pop(buf_id)
+
+            if not refs:
+                self._refs.pop(word, None)
+                lword = lower(word)
+                cases = self._cases.get(lword, set())
+                cases.discard(word)
+                if not cases:
+                    self._cases.pop(lword, None)
+
+    def _truncate(self, buf_id: int, buf: _Buf, lo: int) -> None:
+        for words in buf.lines[lo:]:
+            self._decr(buf_id, words=words)
+        buf.positions.splice(buf.ids, lo=lo, hi=len(buf.ids), new=())
+        del buf.lines[lo:], buf.hashes[lo:], buf.ids[lo:]
+
+    def vacuum(self, live_bufs: Mapping[int, int]) -> None:
+        for buf_id, buf in tuple(self._bufs.items()):
+            if (line_count := live_bufs.get(buf_id)) is None:
+                self._truncate(buf_id, buf=buf, lo=0)
+                self._bufs.pop(buf_id)
+            else:
+                self._truncate(buf_id, buf=buf, lo=line_count)
+
+    def buf_update(self, buf_id: int, filetype: str, filename: str) -> None:
+        if buf := self._bufs.get(buf_id):
+            buf.filetype, buf.filename = filetype, filename
+        else:
+            self._bufs[buf_id] = _Buf(
+                filetype=filetype,
+                filename=filename,
+                lines=[],
+                hashes=array("q"),
+                ids=array("q"),
+            )
+
+    def set_lines(
+        self,
+        buf_id: int,
+        filetype: str,
+        filename: str,
+        lo: int,
+        hi: int,
+        lines: Sequence[str],
+        tokens: Optional[Sequence[str]],
+    ) -> None:
+        self.buf_update(buf_id, filetype=filetype, filename=filename)
+        buf = self._bufs[buf_id]
+        if (pad := lo - len(buf.lines)) > 0:
+            buf.lines.extend(repeat((), pad))
+            buf.hashes.extend(repeat(hash(""), pad))
+            end = len(buf.ids)
+            buf.positions.splice(
+                buf.ids, lo=end, hi=end, new=array("q", repeat(_NIL, pad))
+            )
+            buf.ids.extend(repeat(_NIL, pad))
+
+        pool: MutableMapping[int, MutableSequence[Tuple[Sequence[str], int]]] = {}
+        for words, line_hash, line_id in zip(
+            buf.lines[lo:hi], buf.hashes[lo:hi], buf.ids[lo:hi]
+        ):
+            pool.setdefault(line_hash, []).append((words, line_id))
+
+        new_hashes = array("q", map(hash, lines))
+        new_ids = array("q")
+        new_lines: MutableSequence[Sequence[str]] = []
+        changed: MutableSequence[Tuple[int, str]] = []
+        for line_num, (line, line_hash) in enumerate(zip(lines, new_hashes), start=lo):
+            if reuse := pool.get(line_hash):
+                words, line_id = reuse.pop()
+                new_lines.append(words)
+                new_ids.append(line_id)
+            else:
+                new_lines.append(())
+                new_ids.append(next(_LINE_IDS))
+                changed.append((line_num, line))
+
+        for words, _ in chain.from_iterable(pool.values()):
+            self._decr(buf_id, words=words)
+
+        # Rotates which lines make the `tokenization_limit`
+        shuffle(changed)
+        fresh: MutableSequence[str] = []
+        tokenized = self._tokenize(
+            tuple(line for _, line in changed),
+            tokens=(
+                tuple(tokens[line_num - lo] for line_num, _ in changed)
+                if tokens
+                else None
+            ),
+        )
+        for (line_num, _), (words, complete) in zip(changed, tokenized):
+            idx = line_num - lo
+            new_lines[idx] = words
+            if not complete:
+                new_hashes[idx] = _UNTOKENIZED
+            self._incr(
+                buf_id,
+                line_id=new_ids[idx],
+                line_num=line_num,
+                words=words,
+                fresh=fresh,
+            )
+
+        buf.positions.splice(buf.ids, lo=lo, hi=hi, new=new_ids)
+        buf.lines[lo:hi], buf.hashes[lo:hi], buf.ids[lo:hi] = (
+            new_lines,
+            new_hashes,
+            new_ids,
+        )
+        self._merge(fresh)
+
+    def _prefixed(self, prefix: str) -> Iterator[str]:
+        for lwords in (self._lwords, self._pending):
+            for idx in range(bisect_left(lwords, prefix), len(lwords)):
+                lword = lwords[idx]
+                if not lword.startswith(prefix):
+                    break
+                elif lword in self._cases:
+                    yield lword
+
+    def _owner(self, word: str, filetype: Optional[str]) -> Optional[IndexedWord]:
+        for buf_id, ref in self._refs.get(word, {}).items():
+            buf = self._bufs[buf_id]
+            if filetype is None or buf.filetype == filetype:
+                line_num = buf.positions.get(buf.ids, line_id=ref.line_id)
+                if line_num is None:
+                    # The line `ref` pointed at is gone, but others have `word`
+                    line_num = _locate(buf.lines, word=word, hint=ref.hint)
+                    if line_num is None:
+                        continue
+                    ref.line_id = buf.ids[line_num]
+
+                ref.hint = line_num
+                return IndexedWord(
+                    text=word,
+                    filetype=buf.filetype,
+                    filename=buf.filename,
+                    line_num=line_num + 1,
+                )
+        return None
+
+    def words(
+        self,
+        opts: MatchOptions,
+        filetype: Optional[str],
+        word: str,
+        sym: str,
+        limit: int,
+    ) -> Iterator[IndexedWord]:
+        seen: MutableSet[str] = set()
+        for match in (word, sym):
+            if not match:
+                continue
+
+            l_match = lower(match)
+            prefix = l_match[: opts.exact_matches]
+            for lword in self._prefixed(prefix):
+                if len(seen) >= limit:
+                    return
+                elif (
+                    quick_ratio(l_match, lword, look_ahead=opts.look_ahead)
+                    <= opts.fuzzy_cutoff
+                ):
+                    continue
+
+                for text in self._cases.get(lword, ()):
+                    if text in seen or len(text) + opts.look_ahead < len(match):
+                        continue
+                    elif text == match[: len(text)]:
+                        continue
+                    elif indexed := self._owner(text, filetype=filetype):
+                        seen.add(text)
+                        yield indexed
@@ -0,0 +1,115 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import MutableMapping, MutableSequence, MutableSet, Optional, Sequence
+
+_BLOCK = 512
+
+
+@dataclass(eq=False)
+class _Block:
+    size: int
+    at: int = 0
+
+
+class Positions:
+    """
+    Reverse of a line id array, which is cut into blocks of about `_BLOCK` lines
+
+    Each line id only knows its block, so edits cost O(changed lines + blocks),
+    and lookups O(`_BLOCK` + blocks)
+    """
+
+    def __init__(self) -> None:
+        self._blocks: MutableSequence[_Block] = []
+        self._starts: MutableSequence[int] = []
+        self._owners: MutableMapping[int, _Block] = {}
+        self._touched: MutableSet[_Block] = set()
+
+    def _reindex(self) -> None:
+        self._starts.clear()
+        start = 0
+        for at, block in enumerate(self._blocks):
+            block.at = at
+            self._starts.append(start)
+            start += block.size
+
+    def _rebalance(self, ids: Sequence[int]) -> None:
+        """
+        Split / merge the blocks last edited, needs `ids` as of after the edit
+        """
+
+        touched, self._touched = self._touched, set()
+        for block in touched:
+            if block.at >= len(self._blocks) or self._blocks[block.at] is not block:
+                continue
+
+            at = block.at
+            if block.size < _BLOCK // 2 and len(self._blocks) > 1:
+                into = self._blocks[at - 1] if at else self._blocks[at + 1]
+                start = self._starts[at]
+                for line_id in ids[start : start + block.size]:
+                    self._owners[line_id] = into
+                into.size += block.size
+                del self._blocks[at]
+                self._reindex()
+                block, at = into, into.at
+
+            if block.size > _BLOCK * 2:
+                # Even pieces, each at least `_BLOCK`
+                size = block.size
+                n = size // _BLOCK
+                sizes = [size // n + (i < size % n) for i in range(n)]
+                block.size, lo = sizes[0], self._starts[at] + sizes[0]
+                pieces: MutableSequence[_Block] = []
+                for piece_size in sizes[1:]:
+                    piece = _Block(size=piece_size)
+                    for line_id in ids[lo : lo + piece_size]:
+                        self._owners[line_id] = piece
+                    pieces.append(piece)
+                    lo += piece_size
+                self._blocks[at + 1 : at + 1] = pieces
+                self._reindex()
+
+    def splice(self, ids: Sequence[int], lo: int, hi: int, new: Sequence[int]) -> None:
+        """
+        Call before `ids[lo:hi] = new`, including when padding `ids`
+        """
+
+        self._rebalance(ids)
+        for line_id in ids[lo:hi]:
+            self._owners.pop(line_id, None)
+
+        if not self._blocks:
+            self._blocks.append(_Block(size=0))
+            self._reindex()
+
+        at = max(0, bisect_right(self._starts, lo) - 1)
+        offset, remaining = lo - self._starts[at], hi - lo
+        for block in self._blocks[at:]:
+            if not remaining:
+                break
+            taken = min(remaining, block.size - offset)
+            block.size -= taken
+            remaining -= taken
+            offset = 0
+            self._touched.add(block)
+
+        block = self._blocks[at]
+        block.size += len(new)
+        for line_id in new:
+            self._owners[line_id] = block
+        self._touched.add(block)
+
+        self._blocks[:] = [block for block in self._blocks if block.size]
+        self._reindex()
+
+    def get(self, ids: Sequence[int], line_id: int) -> Optional[int]:
+        self._rebalance(ids)
+        if not (block := self._owners.get(line_id)):
+            return None
+        else:
+            start = self._starts[block.at]
+            try:
+                return start + ids[start : start + block.size].index(line_id)
+            except ValueError:
+                return None
@@ -0,0 +1,12 @@
+BEGIN;
+
+
+DROP VIEW  IF EXISTS words_view;
+DROP TABLE IF EXISTS words;
+DROP TABLE IF EXISTS occurrences;
+DROP TABLE IF EXISTS lines;
+DROP TABLE IF EXISTS vocab;
+DROP TABLE IF EXISTS buffers;
+
+
+END;
@@ -9,44 +9,54 @@ CREATE TABLE IF NOT EXISTS buffers (
 CREATE INDEX IF NOT EXISTS buffers_filetype ON buffers (filetype);
 
 
+-- !! Interned, shared by all buffers
+CREATE TABLE IF NOT EXISTS vocab (
+  rowid INTEGER NOT NULL PRIMARY KEY,
+  word  TEXT    NOT NULL UNIQUE,
+  lword TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS vocab_lword ON vocab (lword);
+
+
 CREATE TABLE IF NOT EXISTS lines (
-  rowid     BLOB    NOT NULL PRIMARY KEY,
+  rowid     INTEGER NOT NULL PRIMARY KEY,
   buffer_id INTEGER NOT NULL REFERENCES buffers (rowid) ON UPDATE CASCADE ON DELETE CASCADE,
+  -- Only accurate as of insertion, line order is tracked in python
   line_num  INTEGER NOT NULL,
-  line      TEXT    NOT NULL,
-  UNIQUE(buffer_id, line_num)
-) WITHOUT ROWID;
+  line      TEXT    NOT NULL
+);
 CREATE INDEX IF NOT EXISTS lines_buffer_id ON lines (buffer_id);
-CREATE INDEX IF NOT EXISTS lines_line_num  ON lines (line_num);
 
 
-CREATE TABLE IF NOT EXISTS words (
-  line_id         BLOB    NOT NULL REFERENCES lines (rowid) ON UPDATE CASCADE ON DELETE CASCADE,
-  word            TEXT    NOT NULL,
-  lword           TEXT    NOT NULL,
-  UNIQUE(line_id, word)
-);
-CREATE INDEX IF NOT EXISTS words_line_id ON words (line_id);
-CREATE INDEX IF NOT EXISTS words_word    ON words (word);
-CREATE INDEX IF NOT EXISTS words_lword   ON words (lword);
+-- !! lines N:M vocab
+CREATE TABLE IF NOT EXISTS occurrences (
+  line_id INTEGER NOT NULL REFERENCES lines (rowid) ON UPDATE CASCADE ON DELETE CASCADE,
+  word_id INTEGER NOT NULL REFERENCES vocab (rowid) ON UPDATE CASCADE ON DELETE CASCADE,
+  PRIMARY KEY (line_id, word_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS occurrences_word_id ON occurrences (word_id);
 
 
 CREATE VIEW IF NOT EXISTS words_view AS
 SELECT
-  words.word,
-  words.lword,
+  vocab.word,
+  vocab.lword,
   buffers.filetype,
   buffers.filename,
+  lines.buffer_id,
+  lines.rowid AS line_id,
   lines.line_num
-FROM buffers
+FROM vocab
+JOIN occurrences
+  ON occurrences.word_id = vocab.rowid
 JOIN lines
-  ON lines.buffer_id = buffers.rowid
-JOIN words
-  ON words.line_id = lines.rowid
+  ON lines.rowid = occurrences.line_id
+JOIN buffers
+  ON buffers.rowid = lines.buffer_id
+WHERE
+  vocab.word <> ''
 GROUP BY
-  words.word
-HAVING
-  words.word <> '';
+  vocab.rowid;
 
 
 END;
@@ -0,0 +1 @@
+DELETE FROM buffers
@@ -0,0 +1,9 @@
+DELETE FROM vocab
+WHERE
+  NOT EXISTS (
+    SELECT
+      1
+    FROM occurrences
+    WHERE
+      occurrences.word_id = vocab.rowid
+  )
@@ -0,0 +1,7 @@
+INSERT OR IGNORE INTO occurrences (line_id, word_id)
+SELECT
+  :line_id,
+  rowid
+FROM vocab
+WHERE
+  word = :word
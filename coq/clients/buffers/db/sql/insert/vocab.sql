@@ -0,0 +1,2 @@
+INSERT OR IGNORE INTO vocab (word,  lword)
+VALUES                      (:word, LOWER(:word))
@@ -1,9 +1,3 @@
 SELECT
-  buffers.rowid,
-  COUNT(lines.rowid) AS line_count
+  rowid
 FROM buffers
-JOIN lines
-ON
-  lines.buffer_id = buffers.rowid
-GROUP BY
-  buffers.rowid
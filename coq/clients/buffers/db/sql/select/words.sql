@@ -2,6 +2,8 @@ SELECT
   word,
   filetype,
   filename,
+  buffer_id,
+  line_id,
   line_num
 FROM words_view
 WHERE
@@ -1,7 +1,18 @@
+from asyncio import Lock
 from dataclasses import dataclass
+from functools import partial
 from os import linesep
 from pathlib import PurePath
-from typing import AsyncIterator, Iterator, Mapping, Optional, Sequence, Tuple
+from typing import (
+    AsyncIterator,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from weakref import WeakValueDictionary
 
 from pynvim_pp.buffer import Buffer
 from pynvim_pp.logging import suppress_and_log
@@ -10,10 +21,13 @@ from pynvim_pp.window import Window
 
 from ...paths.show import fmt_path
 from ...shared.executor import AsyncExecutor
+from ...shared.lines import BufLines
+from ...shared.parse import tokenize_lines
 from ...shared.runtime import Supervisor
 from ...shared.runtime import Worker as BaseWorker
+from ...shared.runtime import refilter
 from ...shared.settings import BuffersClient
-from ...shared.types import Completion, Context, Doc, Edit
+from ...shared.types import Completion, Context, Doc, Edit, LazyDoc
 from .db.database import BDB, BufferWord, Update
 
 
@@ -24,23 +38,34 @@ class _Info:
     filename: str
     range: Tuple[int, int]
     lines: Sequence[str]
-    buffers: Mapping[Buffer, int]
 
 
-async def _info() -> Optional[_Info]:
+async def _line_counts() -> Optional[Mapping[int, int]]:
+    try:
+        bufs = await Buffer.list(listed=True)
+        return {int(buf.number): await buf.line_count() for buf in bufs}
+    except NvimError:
+        return None
+
+
+async def _info(buf_lines: BufLines) -> Optional[_Info]:
     try:
         win = await Window.get_current()
         height = await win.get_height()
         buf = await win.get_buf()
-        bufs = await Buffer.list(listed=True)
-        buffers = {buf: await buf.line_count() for buf in bufs}
-        if (current_lines := buffers.get(buf)) is None:
+        if not await buf.opts.get(bool, "buflisted"):
             return None
         else:
+            current_lines = await buf.line_count()
             row, _ = await win.get_cursor()
             lo = max(0, row - height)
             hi = min(current_lines, row + height + 1)
-            lines = await buf.get_lines(lo=lo, hi=hi)
+            if (
+                lines := buf_lines.get(
+                    buf.number, tick=None, line_count=current_lines, lo=lo, hi=hi
+                )
+            ) is None:
+                lines = await buf.get_lines(lo=lo, hi=hi)
             filetype = await buf.filetype()
             filename = (await buf.get_name()) or ""
             info = _Info(
@@ -49,13 +74,26 @@ async def _info() -> Optional[_Info]:
                 filename=filename,
                 range=(lo, hi),
                 lines=lines,
-                buffers=buffers,
             )
             return info
     except NvimError:
         return None
 
 
+def _update(context: Context) -> Optional[Update]:
+    if change := context.change:
+        return Update(
+            buf_id=context.buf_id,
+            filetype=context.filetype,
+            filename=context.filename,
+            lo=change.range.start,
+            hi=change.range.stop,
+            lines=change.lines,
+        )
+    else:
+        return None
+
+
 def _doc(client: BuffersClient, context: Context, word: BufferWord) -> Doc:
     def cont() -> Iterator[str]:
         if not client.same_filetype and word.filetype:
@@ -82,7 +120,9 @@ class Worker(BaseWorker[BuffersClient, None]):
             supervisor.limits.tokenization_limit,
             unifying_chars=supervisor.match.unifying_chars,
             include_syms=options.match_syms,
+            memory_index=options.memory_index,
         )
+        self._buf_locks: MutableMapping[int, Lock] = WeakValueDictionary()
         super().__init__(ex, supervisor=supervisor, options=options, misc=misc)
         self._ex.run(self._poll())
 
@@ -90,26 +130,48 @@ class Worker(BaseWorker[BuffersClient, None]):
         with self._interrupt():
             self._db.interrupt()
 
+    def _buf_lock(self, buf_id: int) -> Lock:
+        """
+        Held from tokenizing to applying, so each buffer's splices land in order
+        """
+
+        if (lock := self._buf_locks.get(buf_id)) is None:
+            lock = self._buf_locks[buf_id] = Lock()
+        return lock
+
+    async def _tokenize(self, lines: Sequence[str]) -> Optional[Sequence[str]]:
+        if self._supervisor.procpool:
+            return await self._supervisor.offload(
+                tokenize_lines,
+                self._supervisor.match.unifying_chars,
+                self._options.match_syms,
+                lines,
+            )
+        else:
+            return None
+
     async def _poll(self) -> None:
         while True:
 
             async def cont() -> None:
                 with suppress_and_log():
-                    if info := await _info():
+                    if info := await _info(self._supervisor.lines):
                         lo, hi = info.range
-                        buf_line_counts = {
-                            int(buf.number): line_count
-                            for buf, line_count in info.buffers.items()
-                        }
-                        self._db.vacuum(buf_line_counts)
-                        self._db.set_lines(
-                            info.buf_id,
-                            filetype=info.filetype,
-                            filename=info.filename,
-                            lo=lo,
-                            hi=hi,
-                            lines=info.lines,
-                        )
+                        async with self._buf_lock(info.buf_id):
+                            tokens = await self._tokenize(info.lines)
+                            # Counts from before `_tokenize` could already be stale
+                            if (buf_line_counts := await _line_counts()) is None:
+                                return
+                            self._db.vacuum(buf_line_counts)
+                            self._db.set_lines(
+                                info.buf_id,
+                                filetype=info.filetype,
+                                filename=info.filename,
+                                lo=lo,
+                                hi=hi,
+                                lines=info.lines,
+                                tokens=tokens,
+                            )
 
             await self._with_interrupt(cont())
             async with self._idle:
@@ -132,39 +194,52 @@ class Worker(BaseWorker[BuffersClient, None]):
         lines: Sequence[str],
     ) -> None:
         async def cont() -> None:
-            self._db.set_lines(
-                buf_id,
-                filetype=filetype,
-                filename=filename,
-                lo=lo,
-                hi=hi,
-                lines=lines,
-            )
+            async with self._buf_lock(buf_id):
+                tokens = await self._tokenize(lines)
+                self._db.set_lines(
+                    buf_id,
+                    filetype=filetype,
+                    filename=filename,
+                    lo=lo,
+                    hi=hi,
+                    lines=lines,
+                    tokens=tokens,
+                )
 
         await self._ex.submit(cont())
 
+    def _matches(self, context: Context, completion: Completion) -> bool:
+        return refilter(
+            self._supervisor.match,
+            context=context,
+            completion=completion,
+            syms=self._options.match_syms,
+            drop_prefixes=True,
+        )
+
+    async def _side_effects(self, context: Context) -> None:
+        async with self._work_lock, self._buf_lock(context.buf_id):
+            if update := _update(context):
+                self._db.set_lines(
+                    update.buf_id,
+                    filetype=update.filetype,
+                    filename=update.filename,
+                    lo=update.lo,
+                    hi=update.hi,
+                    lines=update.lines,
+                    tokens=None,
+                )
+
     async def _work(self, context: Context) -> AsyncIterator[Completion]:
-        async with self._work_lock:
+        async with self._work_lock, self._buf_lock(context.buf_id):
             filetype = context.filetype if self._options.same_filetype else None
-            update = (
-                Update(
-                    buf_id=context.buf_id,
-                    filetype=context.filetype,
-                    filename=context.filename,
-                    lo=change.range.start,
-                    hi=change.range.stop,
-                    lines=change.lines,
-                )
-                if (change := context.change)
-                else None
-            )
             words = self._db.words(
                 self._supervisor.match,
                 filetype=filetype,
                 word=context.words,
                 sym=context.syms if self._options.match_syms else "",
                 limitless=context.manual,
-                update=update,
+                update=_update(context),
             )
             for word in words:
                 edit = Edit(new_text=word.text)
@@ -176,7 +251,9 @@ class Worker(BaseWorker[BuffersClient, None]):
                     sort_by=word.text,
                     primary_edit=edit,
                     adjust_indent=False,
-                    doc=_doc(self._options, context=context, word=word),
+                    doc=LazyDoc(
+                        partial(_doc, self._options, context=context, word=word)
+                    ),
                     icon_match="Text",
                 )
                 yield cmp
@@ -71,6 +71,8 @@ class _LocalCache:
 
 
 class Worker(BaseWorker[LSPClient, None]):
+    io_bound = True
+
     def __init__(
         self,
         ex: AsyncExecutor,
@@ -96,6 +98,7 @@ class Worker(BaseWorker[LSPClient, None]):
             short_name=self._options.short_name,
             always_on_top=self._options.always_on_top,
             weight_adjust=self._options.weight_adjust,
+            match=self._supervisor.match,
             context=context,
             chunk=self._max_results * 2,
             clients=set() if context.manual else cached_clients,
@@ -211,6 +211,8 @@ def _sort_by(unifying_chars: AbstractSet[str], context: Context, new_text: str)
 
 
 class Worker(BaseWorker[PathsClient, None]):
+    io_bound = True
+
     def __init__(
         self,
         ex: AsyncExecutor,
@@ -7,6 +7,7 @@ from std2.string import removesuffix
 from ...shared.executor import AsyncExecutor
 from ...shared.runtime import Supervisor
 from ...shared.runtime import Worker as BaseWorker
+from ...shared.runtime import refilter
 from ...shared.settings import RegistersClient
 from ...shared.types import Completion, Context, Doc, Edit, SnippetEdit, SnippetGrammar
 from .db.database import RDB
@@ -78,6 +79,17 @@ class Worker(BaseWorker[RegistersClient, None]):
 
         await self._ex.submit(cont())
 
+    def _matches(self, context: Context, completion: Completion) -> bool:
+        # Same split as `RDB.select`, `lines` vs `words`
+        linewise = isinstance(completion.primary_edit, SnippetEdit)
+        return refilter(
+            self._supervisor.match,
+            context=context,
+            completion=completion,
+            syms=linewise or self._options.match_syms,
+            drop_prefixes=not linewise,
+        )
+
     async def _work(self, context: Context) -> AsyncIterator[Completion]:
         async with self._work_lock:
             before = removesuffix(context.line_before, suffix=context.syms_before)
@@ -4,6 +4,7 @@ from typing import AbstractSet, AsyncIterator, Mapping
 from ...shared.executor import AsyncExecutor
 from ...shared.runtime import Supervisor
 from ...shared.runtime import Worker as BaseWorker
+from ...shared.runtime import refilter
 from ...shared.settings import SnippetClient
 from ...shared.types import Completion, Context, Doc, SnippetEdit, SnippetGrammar
 from ...snippets.types import LoadedSnips
@@ -47,6 +48,16 @@ class Worker(BaseWorker[SnippetClient, Path]):
 
         await self._ex.submit(cont())
 
+    def _matches(self, context: Context, completion: Completion) -> bool:
+        # Exact triggers are kept, unlike the word banks
+        return refilter(
+            self._supervisor.match,
+            context=context,
+            completion=completion,
+            syms=True,
+            drop_prefixes=False,
+        )
+
     async def _work(self, context: Context) -> AsyncIterator[Completion]:
         async with self._work_lock:
             snippets = self._db.select(
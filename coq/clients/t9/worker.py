@@ -178,6 +178,8 @@ async def _readline(stdout: StreamReader) -> bytes:
 
 
 class Worker(BaseWorker[T9Client, None]):
+    io_bound = True
+
     def __init__(
         self,
         ex: AsyncExecutor,
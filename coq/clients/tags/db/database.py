@@ -3,17 +3,17 @@ from hashlib import md5
 from os.path import normcase
 from pathlib import Path, PurePath
 from sqlite3 import Connection, OperationalError
-from typing import AbstractSet, Iterator, Mapping, cast
+from typing import AbstractSet, Iterator, Mapping, Sequence, cast
 
 from pynvim_pp.lib import encode
 
 from ....databases.types import DB
 from ....shared.settings import MatchOptions
 from ....shared.sql import BIGGEST_INT, init_db, like_esc
-from ....tags.types import Tag, Tags
+from ....tags.types import Tag
 from .sql import sql
 
-_SCHEMA = "v5"
+_SCHEMA = "v7"
 
 _NIL_TAG = Tag(
     language="",
@@ -58,29 +58,38 @@ class CTDB(DB):
                 return files
         return {}
 
-    def reconciliate(self, dead: AbstractSet[str], new: Tags) -> None:
-        with suppress(OperationalError):
-            with self._conn, closing(self._conn.cursor()) as cursor:
+    def reconciliate(
+        self, dead: AbstractSet[str], new: Mapping[str, float], tags: Sequence[Tag]
+    ) -> None:
+        """
+        `new` files, by mtime, are swapped for `tags` in one transaction
+        """
 
-                def m1() -> Iterator[Mapping]:
-                    for filename, (lang, mtime, _) in new.items():
-                        yield {
-                            "filename": filename,
-                            "filetype": lang,
-                            "mtime": mtime,
-                        }
-
-                def m2() -> Iterator[Mapping]:
-                    for _, _, tags in new.values():
-                        for tag in tags:
-                            yield {**_NIL_TAG, **tag}
+        def m1() -> Iterator[Mapping]:
+            for tag in tags:
+                yield {**_NIL_TAG, **tag}
 
+        filetypes = {normcase(tag["path"]): tag["language"] for tag in tags}
+        with suppress(OperationalError):
+            with self._conn, closing(self._conn.cursor()) as cursor:
+                cursor.execute("BEGIN", ())
                 cursor.executemany(
                     sql("delete", "file"),
                     ({"filename": f} for f in dead | new.keys()),
                 )
-                cursor.executemany(sql("insert", "file"), m1())
-                cursor.executemany(sql("insert", "tag"), m2())
+                # Before the tags, `tag_names` is keyed by filetype
+                cursor.executemany(
+                    sql("insert", "file"),
+                    (
+                        {
+                            "filename": filename,
+                            "filetype": filetypes.get(normcase(filename), ""),
+                            "mtime": mtime,
+                        }
+                        for filename, mtime in new.items()
+                    ),
+                )
+                cursor.executemany(sql("insert", "tag"), m1())
                 cursor.execute("PRAGMA optimize", ())
 
     def select(
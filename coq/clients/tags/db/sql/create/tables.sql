@@ -29,4 +29,84 @@ CREATE INDEX IF NOT EXISTS tags_name ON tags (name);
 CREATE INDEX IF NOT EXISTS tags_lnam ON tags (lname);
 
 
+-- !! Denormalized, one row per (filetype, name), kept in sync by triggers
+-- !! `tag_id` is the rowid of any one tag bearing the name
+CREATE TABLE IF NOT EXISTS tag_names (
+  filetype TEXT    NOT NULL,
+  name     TEXT    NOT NULL,
+  lname    TEXT    NOT NULL,
+  refs     INTEGER NOT NULL,
+  tag_id   INTEGER NOT NULL,
+  PRIMARY KEY (filetype, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tag_names_lname ON tag_names (filetype, lname, name, tag_id);
+
+
+-- !! Cascades would run after the file is gone, and with it the filetype
+CREATE TRIGGER IF NOT EXISTS files_delete BEFORE DELETE ON files
+BEGIN
+  DELETE FROM tags
+  WHERE
+    `path` = old.filename;
+END;
+
+
+CREATE TRIGGER IF NOT EXISTS tags_insert AFTER INSERT ON tags
+BEGIN
+  INSERT INTO tag_names (filetype, name, lname, refs, tag_id)
+  SELECT
+    files.filetype,
+    new.name,
+    new.lname,
+    1,
+    new.rowid
+  FROM files
+  WHERE
+    files.filename = new.`path`
+  ON CONFLICT (filetype, name) DO UPDATE
+  SET
+    refs = refs + 1;
+END;
+
+
+CREATE TRIGGER IF NOT EXISTS tags_delete AFTER DELETE ON tags
+BEGIN
+  UPDATE tag_names
+  SET
+    refs   = refs - 1,
+    tag_id =
+      CASE
+        WHEN tag_id = old.rowid
+        THEN
+          COALESCE(
+            (
+              SELECT
+                tags.rowid
+              FROM tags
+              JOIN files
+              ON
+                files.filename = tags.`path`
+              WHERE
+                tags.name = old.name
+                AND
+                files.filetype = tag_names.filetype
+              LIMIT 1
+            ),
+            tag_id
+          )
+        ELSE tag_id
+      END
+  WHERE
+    name = old.name
+    AND
+    filetype = (SELECT filetype FROM files WHERE filename = old.`path`);
+
+  DELETE FROM tag_names
+  WHERE
+    name = old.name
+    AND
+    refs <= 0;
+END;
+
+
 END;
@@ -1,3 +1,12 @@
-REPLACE INTO tags (`path`,             line,  name,  lname,        pattern,  kind,  typeref,  scope,  scopeKind,  `access`)
-VALUES            (X_NORM_CASE(:path), :line, :name, LOWER(:name), :pattern, :kind, :typeref, :scope, :scopeKind, :access)
-
+-- !! Not `REPLACE`, it would delete without firing `tags_delete`
+INSERT INTO tags (`path`,             line,  name,  lname,        pattern,  kind,  typeref,  scope,  scopeKind,  `access`)
+VALUES           (X_NORM_CASE(:path), :line, :name, LOWER(:name), :pattern, :kind, :typeref, :scope, :scopeKind, :access)
+ON CONFLICT (`path`, name) DO UPDATE
+SET
+  line        = excluded.line,
+  pattern     = excluded.pattern,
+  kind        = excluded.kind,
+  typeref     = excluded.typeref,
+  scope       = excluded.scope,
+  scopeKind   = excluded.scopeKind,
+  `access`    = excluded.`access`
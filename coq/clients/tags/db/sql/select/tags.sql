@@ -4,6 +4,43 @@ WITH fts AS (
   FROM files
   WHERE
     filename = :filename
+),
+candidates AS (
+  SELECT
+    tag_names.name,
+    tag_names.tag_id
+  FROM tag_names
+  JOIN fts
+  ON
+    fts.filetype = tag_names.filetype
+  WHERE
+    tag_names.name <> ''
+    AND
+    (
+      (
+        :word <> ''
+        AND
+        tag_names.lname LIKE :like_word ESCAPE '!'
+        AND
+        LENGTH(tag_names.name) + :look_ahead >= LENGTH(:word)
+        AND
+        tag_names.name <> SUBSTR(:word, 1, LENGTH(tag_names.name))
+        AND
+        X_SIMILARITY(LOWER(:word), tag_names.lname, :look_ahead) > :cut_off
+      )
+      OR
+      (
+        :sym <> ''
+        AND
+        tag_names.lname LIKE :like_sym ESCAPE '!'
+        AND
+        LENGTH(tag_names.name) + :look_ahead >= LENGTH(:sym)
+        AND
+        tag_names.name <> SUBSTR(:sym, 1, LENGTH(tag_names.name))
+        AND
+        X_SIMILARITY(LOWER(:sym), tag_names.lname, :look_ahead) > :cut_off
+      )
+    )
 )
 SELECT
   tags.`path`,
@@ -16,39 +53,16 @@ SELECT
   tags.scope,
   tags.scopeKind,
   tags.`access`
-FROM tags
-JOIN files
-ON
-  files.filename = tags.`path`
-JOIN fts
+FROM candidates
+LEFT JOIN tags AS here
 ON
-  fts.filetype = files.filetype
-WHERE
-  tags.name <> ''
+  here.`path` = :filename
   AND
-  (
-    (
-      :word <> ''
-      AND
-      tags.lname LIKE :like_word ESCAPE '!'
-      AND
-      LENGTH(tags.name) + :look_ahead >= LENGTH(:word)
-      AND
-      tags.name <> SUBSTR(:word, 1, LENGTH(tags.name))
-      AND
-      X_SIMILARITY(LOWER(:word), tags.lname, :look_ahead) > :cut_off
-    )
-    OR
-    (
-      :sym <> ''
-      AND
-      tags.lname LIKE :like_sym ESCAPE '!'
-      AND
-      LENGTH(tags.name) + :look_ahead >= LENGTH(:sym)
-      AND
-      tags.name <> SUBSTR(:sym, 1, LENGTH(tags.name))
-      AND
-      X_SIMILARITY(LOWER(:sym), tags.lname, :look_ahead) > :cut_off
-    )
-  )
+  here.name = candidates.name
+JOIN tags
+ON
+  tags.rowid = COALESCE(here.rowid, candidates.tag_id)
+ORDER BY
+  here.rowid IS NULL,
+  ABS(COALESCE(here.line, 0) - :line_num)
 LIMIT :limit
@@ -1,15 +1,20 @@
+from asyncio import Semaphore, gather
 from contextlib import suppress
-from os import linesep
+from functools import partial
+from os import cpu_count, linesep
 from os.path import normcase
 from pathlib import Path, PurePath
+from stat import S_ISREG
 from string import capwords
+from time import monotonic
 from typing import (
     AbstractSet,
     AsyncIterator,
     Iterable,
     Iterator,
     Mapping,
-    MutableSet,
+    MutableSequence,
+    Sequence,
     Tuple,
 )
 
@@ -18,6 +23,7 @@ from pynvim_pp.buffer import Buffer
 from pynvim_pp.logging import suppress_and_log
 from pynvim_pp.rpc_types import NvimError
 from std2.asyncio import to_thread
+from std2.itertools import batched
 
 from ...paths.show import fmt_path
 from ...shared.executor import AsyncExecutor
@@ -25,11 +31,16 @@ from ...shared.runtime import Supervisor
 from ...shared.runtime import Worker as BaseWorker
 from ...shared.settings import TagsClient
 from ...shared.timeit import timeit
-from ...shared.types import Completion, Context, Doc, Edit
-from ...tags.parse import parse, run
+from ...shared.types import Completion, Context, Doc, Edit, LazyDoc
+from ...tags.crawl import crawl
+from ...tags.parse import parse, stream, unescape
 from ...tags.types import Tag
 from .db.database import CTDB
 
+_BATCH = 64
+_PARALLEL = max(1, (cpu_count() or 1) // 2)
+_RECRAWL = 60.0
+
 
 async def _ls() -> AbstractSet[str]:
     try:
@@ -50,7 +61,8 @@ async def _mtimes(paths: AbstractSet[str]) -> Mapping[str, float]:
         for path in map(Path, paths):
             with suppress(OSError):
                 stat = path.stat()
-                yield path, stat.st_mtime
+                if S_ISREG(stat.st_mode):
+                    yield path, stat.st_mtime
 
     c2 = lambda: {normcase(key): val for key, val in c1()}
     return await to_thread(c2)
@@ -121,7 +133,8 @@ def _doc(client: TagsClient, context: Context, tag: Tag) -> Doc:
             yield rc
             yield linesep
 
-        yield tag["pattern"] or tag["name"]
+        pattern = tag["pattern"]
+        yield unescape(pattern) if pattern else tag["name"]
 
     doc = Doc(
         text="".join(cont()),
@@ -140,6 +153,9 @@ class Worker(BaseWorker[TagsClient, Tuple[Path, Path, PurePath]]):
     ) -> None:
         self._exec, vars_dir, cwd = misc
         self._db = CTDB(vars_dir, cwd=cwd)
+        self._cwd = cwd
+        self._crawled: Tuple[float, AbstractSet[str]] = (0.0, set())
+        self._settled = False
         super().__init__(ex, supervisor=supervisor, options=options, misc=misc)
         self._ex.run(self._poll())
 
@@ -147,24 +163,73 @@ class Worker(BaseWorker[TagsClient, Tuple[Path, Path, PurePath]]):
         with self._interrupt():
             self._db.interrupt()
 
+    def _on_change(self) -> None:
+        self._ex.run(self.idle())
+
+    async def _crawl(self) -> AbstractSet[str]:
+        if not self._options.crawl:
+            return set()
+        else:
+            cwd = self._cwd
+            crawled_at, crawled = self._crawled
+            if monotonic() - crawled_at > _RECRAWL:
+                crawled = await crawl(cwd)
+                if cwd == self._cwd:
+                    self._crawled = (monotonic(), crawled)
+            return crawled
+
+    async def _index(self, mtimes: Mapping[str, float], paths: Sequence[str]) -> None:
+        """
+        Batches of files go to at most `_PARALLEL` concurrent `ctags`,
+        output is `offload`-ed to `parse` as it is read, each batch written at once
+        """
+
+        sem = Semaphore(_PARALLEL)
+
+        async def cont(batch: Sequence[str]) -> None:
+            async with sem:
+                files = {*map(normcase, batch)}
+                acc: MutableSequence[Tag] = []
+                async for raw in stream(self._exec, *batch):
+                    tags = await self._supervisor.offload(parse, raw)
+                    acc.extend(tag for tag in tags if normcase(tag["path"]) in files)
+                # Old tags stay until the new ones are all in, interrupted or not
+                self._db.reconciliate(
+                    set(), new={path: mtimes.get(path, 0) for path in batch}, tags=acc
+                )
+
+        await gather(*map(cont, batched(paths, n=_BATCH)))
+
     async def _poll(self) -> None:
         while True:
 
             async def cont() -> None:
                 with suppress_and_log(), timeit("IDLE :: TAGS"):
                     buf_names = await _ls()
+                    crawled = await self._crawl()
                     existing = self._db.paths()
-                    paths = buf_names | existing.keys()
-                    mtimes = await _mtimes(paths)
-                    query_paths = tuple(
-                        path
-                        for path, mtime in mtimes.items()
-                        if mtime > existing.get(path, 0)
+                    paths = {*map(normcase, buf_names | crawled)} | existing.keys()
+                    changed = self._supervisor.watcher.watch(
+                        self, paths=paths, on_change=self._on_change
                     )
-                    raw = await run(self._exec, *query_paths) if query_paths else ""
-                    new = parse(mtimes, raw=raw)
-                    dead = existing.keys() - mtimes.keys()
-                    self._db.reconciliate(dead, new=new)
+                    # Only stat what could have changed, unless last poll was cut
+                    settled, self._settled = self._settled, False
+                    stale = changed if settled and changed is not None else paths
+                    mtimes = await _mtimes(stale)
+                    bufs = {*map(normcase, buf_names)}
+                    # Open buffers go first, the crawl can take its time
+                    query_paths = sorted(
+                        (
+                            path
+                            for path, mtime in mtimes.items()
+                            if mtime > existing.get(path, 0)
+                        ),
+                        key=lambda p: p not in bufs,
+                    )
+                    dead = (existing.keys() & stale) - mtimes.keys()
+                    self._db.reconciliate(dead, new={}, tags=())
+                    await self._index(mtimes, paths=query_paths)
+                    self._settled = True
 
             await self._with_interrupt(cont())
             async with self._idle:
@@ -174,6 +239,9 @@ class Worker(BaseWorker[TagsClient, Tuple[Path, Path, PurePath]]):
         async def cont() -> None:
             with self._interrupt_lock:
                 self._db.swap(cwd)
+                self._cwd = cwd
+                self._crawled = (0.0, set())
+                self._settled = False
 
         await self._ex.submit(cont())
 
@@ -189,23 +257,20 @@ class Worker(BaseWorker[TagsClient, Tuple[Path, Path, PurePath]]):
                 limitless=context.manual,
             )
 
-            seen: MutableSet[str] = set()
             for tag in tags:
                 name = tag["name"]
-                if name not in seen:
-                    seen.add(name)
-                    edit = Edit(new_text=name)
-                    kind = capwords(tag["kind"])
-                    cmp = Completion(
-                        source=self._options.short_name,
-                        always_on_top=self._options.always_on_top,
-                        weight_adjust=self._options.weight_adjust,
-                        label=edit.new_text,
-                        sort_by=name,
-                        primary_edit=edit,
-                        adjust_indent=False,
-                        kind=kind,
-                        doc=_doc(self._options, context=context, tag=tag),
-                        icon_match=kind,
-                    )
-                    yield cmp
+                edit = Edit(new_text=name)
+                kind = capwords(tag["kind"])
+                cmp = Completion(
+                    source=self._options.short_name,
+                    always_on_top=self._options.always_on_top,
+                    weight_adjust=self._options.weight_adjust,
+                    label=edit.new_text,
+                    sort_by=name,
+                    primary_edit=edit,
+                    adjust_indent=False,
+                    kind=kind,
+                    doc=LazyDoc(partial(_doc, self._options, context=context, tag=tag)),
+                    icon_match=kind,
+                )
+                yield cmp
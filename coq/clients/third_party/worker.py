@@ -14,6 +14,7 @@ class Worker(LSPWorker):
             short_name=self._options.short_name,
             always_on_top=self._options.always_on_top,
             weight_adjust=self._options.weight_adjust,
+            match=self._supervisor.match,
             context=context,
             chunk=self._max_results * 2,
             clients=set() if context.manual else cached_clients,
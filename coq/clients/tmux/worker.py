@@ -1,4 +1,5 @@
 from asyncio import Lock
+from functools import partial
 from os import linesep
 from pathlib import Path
 from typing import AsyncIterator, Iterator
@@ -8,9 +9,10 @@ from pynvim_pp.logging import suppress_and_log
 from ...shared.executor import AsyncExecutor
 from ...shared.runtime import Supervisor
 from ...shared.runtime import Worker as BaseWorker
+from ...shared.runtime import refilter
 from ...shared.settings import TmuxClient
 from ...shared.timeit import timeit
-from ...shared.types import Completion, Context, Doc, Edit
+from ...shared.types import Completion, Context, Doc, Edit, LazyDoc
 from ...tmux.parse import snapshot
 from .db.database import TMDB, TmuxWord
 
@@ -65,6 +67,15 @@ class Worker(BaseWorker[TmuxClient, Path]):
     async def periodical(self) -> None:
         await self._ex.submit(self._periodical())
 
+    def _matches(self, context: Context, completion: Completion) -> bool:
+        return refilter(
+            self._supervisor.match,
+            context=context,
+            completion=completion,
+            syms=self._options.match_syms,
+            drop_prefixes=True,
+        )
+
     async def _work(self, context: Context) -> AsyncIterator[Completion]:
         async with self._work_lock:
             words = self._db.select(
@@ -84,7 +95,7 @@ class Worker(BaseWorker[TmuxClient, Path]):
                     sort_by=word.text,
                     primary_edit=edit,
                     adjust_indent=False,
-                    doc=_doc(self._options, word=word),
+                    doc=LazyDoc(partial(_doc, self._options, word=word)),
                     icon_match="Text",
                 )
                 yield cmp
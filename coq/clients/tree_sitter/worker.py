@@ -1,4 +1,5 @@
 from asyncio import Lock, gather
+from functools import partial
 from os import linesep
 from pathlib import PurePath
 from typing import AsyncIterator, Iterator, Mapping, Optional, Tuple
@@ -13,7 +14,7 @@ from ...shared.executor import AsyncExecutor
 from ...shared.runtime import Supervisor
 from ...shared.runtime import Worker as BaseWorker
 from ...shared.settings import TSClient
-from ...shared.types import Completion, Context, Doc, Edit
+from ...shared.types import Completion, Context, Doc, Edit, LazyDoc
 from ...treesitter.request import async_request
 from ...treesitter.types import Payload
 from .db.database import TDB
@@ -92,7 +93,7 @@ def _trans(client: TSClient, context: Context, payload: Payload) -> Completion:
         primary_edit=edit,
         adjust_indent=False,
         kind=payload.kind,
-        doc=_doc(client, context=context, payload=payload),
+        doc=LazyDoc(partial(_doc, client, context=context, payload=payload)),
         icon_match=icon_match,
     )
     return cmp
@@ -39,6 +39,7 @@ REPL_GRAMMAR = environ.get("COQ_GRAMMAR", "lsp")
 DEBUG = "COQ_DEBUG" in environ
 DEBUG_METRICS = "COQ_DEBUG_METRICS" in environ
 DEBUG_DB = "COQ_DEBUG_DB" in environ
+BENCH = "COQ_BENCH" in environ
 
 BUFFER_DB = normpath(TMP_DIR / "buffers.sqlite3") if DEBUG_DB else ":memory:"
 TREESITTER_DB = normpath(TMP_DIR / "treesitter.sqlite3") if DEBUG_DB else ":memory:"
@@ -1,7 +1,11 @@
+from asyncio import TimerHandle, get_running_loop
+from atexit import register
+from collections import OrderedDict
 from contextlib import closing, suppress
 from dataclasses import dataclass
+from itertools import count, islice
 from sqlite3 import Connection, OperationalError
-from typing import Iterator, Mapping
+from typing import Iterator, Mapping, MutableMapping, MutableSequence, Optional
 
 from ...consts import INSERT_DB
 from ...shared.sql import init_db
@@ -26,6 +30,10 @@ class Statistics:
     q99_items: int
 
 
+_RECENCY = 100
+_FLUSH_DELAY = 0.5
+
+
 def _init() -> Connection:
     conn = Connection(INSERT_DB, isolation_level=None)
     init_db(conn)
@@ -34,9 +42,59 @@ def _init() -> Connection:
     return conn
 
 
+def _recency(conn: Connection) -> MutableMapping[str, int]:
+    with suppress(OperationalError):
+        with conn, closing(conn.cursor()) as cursor:
+            cursor.execute(sql("select", "inserted"), {"limit": _RECENCY})
+            rows = sorted(
+                (row["insert_order"], row["sort_by"]) for row in cursor.fetchall()
+            )
+            return OrderedDict((sort_by, order) for order, sort_by in rows)
+    return OrderedDict()
+
+
 class IDB(DB):
+    """
+    Recency is served from memory
+
+    Telemetry rows are queued, and written out together after `_FLUSH_DELAY`,
+    or on exit
+    """
+
     def __init__(self) -> None:
+        self._loop = get_running_loop()
         self._conn = _init()
+        self._recency = _recency(self._conn)
+        self._order = count(max(self._recency.values(), default=0) + 1)
+        self._flushing: Optional[TimerHandle] = None
+        self._queues: Mapping[str, MutableSequence[Mapping]] = {
+            name: [] for name in ("batch", "instance", "instance_stat", "inserted")
+        }
+        register(self.flush)
+
+    def _enqueue(self, name: str, row: Mapping) -> None:
+        self._queues[name].append(row)
+        if not self._flushing:
+            self._flushing = self._loop.call_later(_FLUSH_DELAY, self.flush)
+
+    def flush(self) -> None:
+        """
+        Rows stay queued for the next flush, unless committed
+        """
+
+        if handle := self._flushing:
+            self._flushing = None
+            handle.cancel()
+
+        with suppress(OperationalError):
+            with self._conn, closing(self._conn.cursor()) as cursor:
+                cursor.execute("BEGIN", ())
+                # Dict order is foreign key order
+                for name, queue in self._queues.items():
+                    cursor.executemany(sql("insert", name), queue)
+
+            for queue in self._queues.values():
+                queue.clear()
 
     def new_source(self, source: str) -> None:
         # MUST OK
@@ -44,54 +102,42 @@ class IDB(DB):
             cursor.execute(sql("insert", "source"), {"name": source})
 
     def new_batch(self, batch_id: bytes) -> None:
-        # MUST OK
-        with self._conn, closing(self._conn.cursor()) as cursor:
-            cursor.execute(sql("insert", "batch"), {"rowid": batch_id})
+        self._enqueue("batch", {"rowid": batch_id})
 
     def new_instance(self, instance: bytes, source: str, batch_id: bytes) -> None:
-        # MUST OK
-        with self._conn, closing(self._conn.cursor()) as cursor:
-            cursor.execute(
-                sql("insert", "instance"),
-                {"rowid": instance, "source_id": source, "batch_id": batch_id},
-            )
+        self._enqueue(
+            "instance",
+            {"rowid": instance, "source_id": source, "batch_id": batch_id},
+        )
 
     def new_stat(
         self, instance: bytes, interrupted: bool, duration: float, items: int
     ) -> None:
-        # MUST OK
-        with self._conn, closing(self._conn.cursor()) as cursor:
-            cursor.execute(
-                sql("insert", "instance_stat"),
-                {
-                    "instance_id": instance,
-                    "interrupted": interrupted,
-                    "duration": duration,
-                    "items": items,
-                },
-            )
+        self._enqueue(
+            "instance_stat",
+            {
+                "instance_id": instance,
+                "interrupted": interrupted,
+                "duration": duration,
+                "items": items,
+            },
+        )
 
     def insertion_order(self, n_rows: int) -> Mapping[str, int]:
-        # can interrupt
-        with suppress(OperationalError):
-            with self._conn, closing(self._conn.cursor()) as cursor:
-                cursor.execute(sql("select", "inserted"), {"limit": n_rows})
-                order = {
-                    row["sort_by"]: row["insert_order"] for row in cursor.fetchall()
-                }
-                return order
-        return {}
+        recent = islice(reversed(self._recency.items()), n_rows)
+        return {sort_by: order for sort_by, order in recent}
 
     def inserted(self, instance_id: bytes, sort_by: str) -> None:
-        # MUST OK
-        with self._conn, closing(self._conn.cursor()) as cursor:
-            cursor.execute(
-                sql("insert", "inserted"),
-                {"instance_id": instance_id, "sort_by": sort_by},
-            )
+        self._recency.pop(sort_by, None)
+        self._recency[sort_by] = next(self._order)
+        while len(self._recency) > _RECENCY:
+            self._recency.popitem(last=False)
+
+        self._enqueue("inserted", {"instance_id": instance_id, "sort_by": sort_by})
 
     def stats(self) -> Iterator[Statistics]:
         # MUST OK
+        self.flush()
         with self._conn, closing(self._conn.cursor()) as cursor:
             cursor.execute(sql("select", "summaries"), ())
 
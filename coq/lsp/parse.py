@@ -1,11 +1,14 @@
 from dataclasses import asdict
+from functools import partial
 from typing import (
     AbstractSet,
     Any,
+    Iterator,
     Mapping,
     MutableMapping,
     Optional,
     Sequence,
+    Tuple,
     Type,
     Union,
 )
@@ -25,13 +28,16 @@ from ..shared.types import (
     Encoding,
     ExternLSP,
     ExternLUA,
+    LazyDoc,
     RangeEdit,
     SnippetEdit,
     SnippetGrammar,
     SnippetRangeEdit,
+    WTF8Pos,
 )
 from .protocol import LSProtocol
 from .types import (
+    Command,
     CompletionItem,
     CompletionResponse,
     InsertReplaceEdit,
@@ -50,6 +56,7 @@ _defaults_parser = new_decoder[Optional[ItemDefaults]](
     Optional[ItemDefaults], strict=False, decoders=()
 )
 _item_parser = _new_parser(CompletionItem, path=(), strict=False, decoders=())
+_NO_DEFAULTS = ItemDefaults()
 
 
 def _with_defaults(defaults: ItemDefaults, item: Any) -> Any:
@@ -68,22 +75,26 @@ def _with_defaults(defaults: ItemDefaults, item: Any) -> Any:
     return item
 
 
-def _range_edit(
-    encoding: Encoding,
-    cursors: Cursors,
-    fallback: Optional[str],
-    edit: Union[TextEdit, InsertReplaceEdit],
-) -> RangeEdit:
+def _cursor(encoding: Encoding, cursors: Cursors) -> int:
     _, u8, u16, u32 = cursors
     if encoding == UTF16:
-        cursor = u16
+        return u16
     elif encoding == UTF8:
-        cursor = u8
+        return u8
     elif encoding == UTF32:
-        cursor = u32
+        return u32
     else:
         never(encoding)
 
+
+def _range_edit(
+    encoding: Encoding,
+    cursors: Cursors,
+    fallback: Optional[str],
+    edit: Union[TextEdit, InsertReplaceEdit],
+) -> RangeEdit:
+    cursor = _cursor(encoding, cursors=cursors)
+
     if isinstance(edit, TextEdit):
         ra_start = edit.range.start
         ra_end = edit.range.end
@@ -156,6 +167,300 @@ def _doc(item: CompletionItem) -> Optional[Doc]:
         return None
 
 
+class _LazyEdits(Sequence[RangeEdit]):
+    """
+    `additionalTextEdits`, only decoded once iterated
+
+    `raw` must already pass `_is_text_edit`, so `len` is known without decoding
+    """
+
+    def __init__(self, encoding: Encoding, raw: Sequence[Any]) -> None:
+        self._encoding, self._raw = encoding, raw
+        self._edits: Optional[Sequence[RangeEdit]] = None
+
+    def _decoded(self) -> Sequence[RangeEdit]:
+        if self._edits is None:
+            self._edits = tuple(
+                edit
+                for raw in self._raw
+                if (
+                    edit := _fast_edit(
+                        self._encoding, cursor=-1, fallback=None, edit=raw
+                    )
+                )
+            )
+        return self._edits
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def __getitem__(self, idx: Any) -> Any:
+        return self._decoded()[idx]
+
+    def __iter__(self) -> Iterator[RangeEdit]:
+        return iter(self._decoded())
+
+
+def _opt(thing: Any, t: Union[type, Tuple[type, ...]]) -> bool:
+    return thing is None or isinstance(thing, t)
+
+
+def _fast_pos(pos: Any) -> Optional[WTF8Pos]:
+    if isinstance(pos, Mapping):
+        line, character = pos.get("line"), pos.get("character")
+        if isinstance(line, int) and isinstance(character, int):
+            return line, character
+    return None
+
+
+def _fast_range(ra: Any) -> Optional[Tuple[WTF8Pos, WTF8Pos]]:
+    if (
+        isinstance(ra, Mapping)
+        and (begin := _fast_pos(ra.get("start")))
+        and (end := _fast_pos(ra.get("end")))
+    ):
+        return begin, end
+    else:
+        return None
+
+
+def _fast_edit(
+    encoding: Encoding, cursor: int, fallback: Optional[str], edit: Any
+) -> Optional[RangeEdit]:
+    if not isinstance(edit, Mapping) or not isinstance(
+        new_text := edit.get("newText"), str
+    ):
+        return None
+    elif "range" in edit:
+        ra = _fast_range(edit["range"])
+    elif _fast_range(edit.get("insert")):
+        ra = _fast_range(edit.get("replace"))
+    else:
+        ra = None
+
+    if not ra:
+        return None
+    else:
+        begin, end = ra
+        return RangeEdit(
+            new_text=new_text,
+            fallback=fallback,
+            begin=begin,
+            end=end,
+            cursor_pos=cursor,
+            encoding=encoding,
+        )
+
+
+def _is_text_edit(edit: Any) -> bool:
+    return (
+        isinstance(edit, Mapping)
+        and isinstance(edit.get("newText"), str)
+        and _fast_range(edit.get("range")) is not None
+    )
+
+
+def _fast_doc(documentation: Any, detail: Optional[str]) -> Optional[Doc]:
+    if isinstance(documentation, Mapping):
+        return Doc(text=documentation["value"], syntax=documentation["kind"])
+    elif isinstance(documentation, str):
+        return Doc(text=documentation, syntax="")
+    elif detail:
+        return Doc(text=detail, syntax="")
+    else:
+        return None
+
+
+def _fast_item(
+    protocol: LSProtocol,
+    extern_type: Union[Type[ExternLSP], Type[ExternLUA]],
+    on_top: bool,
+    client: Optional[str],
+    encoding: Encoding,
+    cursors: Cursors,
+    short_name: str,
+    weight_adjust: float,
+    item: Any,
+) -> Optional[Completion]:
+    """
+    Same as `_generic_item`, for the common shapes only
+
+    `None` is not understood, rather than invalid
+    """
+
+    if not isinstance(item, Mapping):
+        return None
+
+    label = item.get("label")
+    details = item.get("labelDetails")
+    kind = item.get("kind")
+    detail = item.get("detail")
+    documentation = item.get("documentation")
+    preselect = item.get("preselect")
+    filter_text = item.get("filterText")
+    insert_text = item.get("insertText")
+    text_format = item.get("insertTextFormat")
+    text_mode = item.get("insertTextMode")
+    text_edit = item.get("textEdit")
+    edits = item.get("additionalTextEdits")
+    command = item.get("command")
+
+    if not (
+        isinstance(label, str)
+        and _opt(kind, int)
+        and _opt(detail, str)
+        and _opt(preselect, bool)
+        and _opt(filter_text, str)
+        and _opt(insert_text, str)
+        and _opt(text_format, int)
+        and _opt(text_mode, int)
+        and _opt(edits, (list, tuple))
+        and all(map(_is_text_edit, edits or ()))
+        and (
+            details is None
+            or isinstance(details, Mapping)
+            and _opt(details.get("detail"), str)
+            and _opt(details.get("description"), str)
+        )
+        and (
+            _opt(documentation, str)
+            or isinstance(documentation, Mapping)
+            and isinstance(documentation.get("kind"), str)
+            and isinstance(documentation.get("value"), str)
+        )
+        and (
+            command is None
+            or isinstance(command, Mapping)
+            and isinstance(command.get("title"), str)
+            and isinstance(command.get("command"), str)
+        )
+    ):
+        return None
+
+    if text_edit is None:
+        r_edit = None
+    elif not (
+        r_edit := _fast_edit(
+            encoding,
+            cursor=_cursor(encoding, cursors=cursors),
+            fallback=insert_text,
+            edit=text_edit,
+        )
+    ):
+        return None
+
+    p_edit: Edit
+    if protocol.InsertTextFormat.get(text_format) == "Snippet":
+        p_edit = (
+            SnippetRangeEdit(
+                grammar=SnippetGrammar.lsp,
+                new_text=r_edit.new_text,
+                fallback=r_edit.fallback,
+                begin=r_edit.begin,
+                end=r_edit.end,
+                cursor_pos=r_edit.cursor_pos,
+                encoding=r_edit.encoding,
+            )
+            if r_edit
+            else SnippetEdit(
+                grammar=SnippetGrammar.lsp, new_text=insert_text or label
+            )
+        )
+    else:
+        p_edit = r_edit or Edit(new_text=insert_text or label)
+
+    doc = (
+        LazyDoc(partial(_fast_doc, documentation, detail))
+        if documentation is not None or detail
+        else None
+    )
+
+    cmd = (
+        Command(
+            title=command["title"],
+            command=command["command"],
+            arguments=command.get("arguments"),
+        )
+        if command
+        else None
+    )
+    c_kind = protocol.CompletionItemKind.get(kind, "")
+    comp = Completion(
+        source=short_name,
+        always_on_top=on_top,
+        weight_adjust=weight_adjust,
+        label=label + (details.get("detail") or "") if details is not None else label,
+        primary_edit=p_edit,
+        adjust_indent=_adjust_indent(text_mode, edit=p_edit),
+        secondary_edits=_LazyEdits(encoding, raw=edits) if edits else (),
+        sort_by=filter_text
+        or (label if isinstance(p_edit, SnippetEdit) else p_edit.new_text),
+        preselect=preselect or False,
+        kind=c_kind,
+        doc=doc,
+        icon_match=c_kind,
+        extern=extern_type(client=client, item=item, command=cmd),
+    )
+    return comp
+
+
+def _generic_item(
+    protocol: LSProtocol,
+    extern_type: Union[Type[ExternLSP], Type[ExternLUA]],
+    on_top: bool,
+    client: Optional[str],
+    encoding: Encoding,
+    cursors: Cursors,
+    short_name: str,
+    weight_adjust: float,
+    item: Any,
+) -> Optional[Completion]:
+    go, parsed = _item_parser(item)
+    if not go:
+        log.warn("%s", parsed)
+        return None
+    else:
+        assert isinstance(parsed, CompletionItem)
+        label = (
+            parsed.label + (label_detail.detail or "")
+            if (label_detail := parsed.labelDetails)
+            else parsed.label
+        )
+        p_edit = _primary(protocol, encoding=encoding, cursors=cursors, item=parsed)
+        adjust_indent = _adjust_indent(parsed.insertTextMode, edit=p_edit)
+        r_edits = tuple(
+            _range_edit(encoding, cursors=(-1, -1, -1, -1), fallback=None, edit=edit)
+            for edit in (parsed.additionalTextEdits or ())
+        )
+        sort_by = parsed.filterText or (
+            parsed.label if isinstance(p_edit, SnippetEdit) else p_edit.new_text
+        )
+        kind = protocol.CompletionItemKind.get(item.get("kind"), "")
+        doc = (
+            LazyDoc(partial(_doc, parsed))
+            if parsed.documentation is not None or parsed.detail
+            else None
+        )
+        extern = extern_type(client=client, item=item, command=parsed.command)
+
+        comp = Completion(
+            source=short_name,
+            always_on_top=on_top,
+            weight_adjust=weight_adjust,
+            label=label,
+            primary_edit=p_edit,
+            adjust_indent=adjust_indent,
+            secondary_edits=r_edits,
+            sort_by=sort_by,
+            preselect=parsed.preselect or False,
+            kind=kind,
+            doc=doc,
+            icon_match=kind,
+            extern=extern,
+        )
+        return comp
+
+
 def parse_item(
     protocol: LSProtocol,
     extern_type: Union[Type[ExternLSP], Type[ExternLUA]],
@@ -170,53 +475,25 @@ def parse_item(
     if not item:
         return None
     else:
-        go, parsed = _item_parser(item)
-        if not go:
-            log.warn("%s", parsed)
-            return None
-        else:
-            assert isinstance(parsed, CompletionItem)
-            on_top = (
-                False
-                if always_on_top is None
-                else (not always_on_top or client in always_on_top)
-            )
-            label = (
-                parsed.label + (label_detail.detail or "")
-                if (label_detail := parsed.labelDetails)
-                else parsed.label
-            )
-            p_edit = _primary(protocol, encoding=encoding, cursors=cursors, item=parsed)
-            adjust_indent = _adjust_indent(parsed.insertTextMode, edit=p_edit)
-            r_edits = tuple(
-                _range_edit(
-                    encoding, cursors=(-1, -1, -1, -1), fallback=None, edit=edit
-                )
-                for edit in (parsed.additionalTextEdits or ())
-            )
-            sort_by = parsed.filterText or (
-                parsed.label if isinstance(p_edit, SnippetEdit) else p_edit.new_text
-            )
-            kind = protocol.CompletionItemKind.get(item.get("kind"), "")
-            doc = _doc(parsed)
-            extern = extern_type(client=client, item=item, command=parsed.command)
-
-            comp = Completion(
-                source=short_name,
-                always_on_top=on_top,
+        on_top = (
+            False
+            if always_on_top is None
+            else (not always_on_top or client in always_on_top)
+        )
+        for p in (_fast_item, _generic_item):
+            if comp := p(
+                protocol,
+                extern_type=extern_type,
+                on_top=on_top,
+                client=client,
+                encoding=encoding,
+                cursors=cursors,
+                short_name=short_name,
                 weight_adjust=weight_adjust,
-                label=label,
-                primary_edit=p_edit,
-                adjust_indent=adjust_indent,
-                secondary_edits=r_edits,
-                sort_by=sort_by,
-                preselect=parsed.preselect or False,
-                kind=kind,
-                doc=doc,
-                icon_match=kind,
-                extern=extern,
-            )
-            return comp
+                item=item,
+            ):
+                return comp
+        return None
 
 
 def parse(
@@ -241,7 +518,8 @@ def parse(
             return LSPcomp(client=client, local_cache=is_complete, items=iter(()))
 
         else:
-            defaults = _defaults_parser(resp.get("itemDefaults")) or ItemDefaults()
+            defaults = _defaults_parser(resp.get("itemDefaults")) or _NO_DEFAULTS
+            has_defaults = defaults != _NO_DEFAULTS
             comps = (
                 co1
                 for item in items
@@ -255,7 +533,11 @@ def parse(
                         short_name=short_name,
                         cursors=cursors,
                         weight_adjust=weight_adjust,
-                        item=_with_defaults(defaults, item=item),
+                        item=(
+                            _with_defaults(defaults, item=item)
+                            if has_defaults
+                            else item
+                        ),
                     )
                 )
             )
@@ -263,7 +545,6 @@ def parse(
             return LSPcomp(client=client, local_cache=is_complete, items=comps)
 
     elif isinstance(resp, Sequence):
-        defaults = ItemDefaults()
         comps = (
             co2
             for item in resp
@@ -277,7 +558,7 @@ def parse(
                     short_name=short_name,
                     cursors=cursors,
                     weight_adjust=weight_adjust,
-                    item=_with_defaults(defaults, item=item),
+                    item=item,
                 )
             )
         )
@@ -1,23 +1,40 @@
 from typing import AbstractSet, AsyncIterator, Optional, cast
 
+from ...shared.settings import MatchOptions
 from ...shared.types import Context, ExternLSP, ExternLUA
 from ..parse import parse
 from ..protocol import protocol
 from ..types import CompletionResponse, LSPcomp
-from .request import async_request
+from .request import Prefilter, async_request
+
+
+def _prefilter(match: MatchOptions, context: Context) -> Prefilter:
+    return Prefilter(
+        cwords=(context.l_words_before, context.l_syms_before),
+        look_ahead=match.look_ahead,
+        cutoff=match.fuzzy_cutoff,
+    )
 
 
 async def comp_lsp(
     short_name: str,
     always_on_top: Optional[AbstractSet[Optional[str]]],
     weight_adjust: float,
+    match: MatchOptions,
     context: Context,
     chunk: int,
     clients: AbstractSet[str],
 ) -> AsyncIterator[LSPcomp]:
     pc = await protocol()
 
-    async for client in async_request("lsp_comp", chunk, clients, context.cursor):
+    async for client in async_request(
+        "lsp_comp",
+        chunk,
+        clients,
+        context.cursor,
+        prefilter=_prefilter(match, context=context),
+        projected=True,
+    ):
         resp = cast(CompletionResponse, client.message)
         parsed = parse(
             pc,
@@ -37,6 +54,7 @@ async def comp_thirdparty(
     short_name: str,
     always_on_top: Optional[AbstractSet[Optional[str]]],
     weight_adjust: float,
+    match: MatchOptions,
     context: Context,
     chunk: int,
     clients: AbstractSet[str],
@@ -44,7 +62,12 @@ async def comp_thirdparty(
     pc = await protocol()
 
     async for client in async_request(
-        "lsp_third_party", chunk, clients, context.cursor, context.line
+        "lsp_third_party",
+        chunk,
+        clients,
+        context.cursor,
+        context.line,
+        prefilter=_prefilter(match, context=context),
     ):
         name = client.name or short_name
         resp = cast(CompletionResponse, client.message)
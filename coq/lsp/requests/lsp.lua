@@ -34,29 +34,118 @@
   local cid = -1
   local acc = {}
 
-  COQ.lsp_pull = function(client, uid, lo, hi)
+  -- fields `coq/lsp/types.py::CompletionItem` reads
+  local item_fields = {
+    label = true,
+    labelDetails = true,
+    kind = true,
+    tags = true,
+    detail = true,
+    documentation = true,
+    preselect = true,
+    filterText = true,
+    insertText = true,
+    insertTextFormat = true,
+    insertTextMode = true,
+    textEdit = true,
+    additionalTextEdits = true,
+    command = true,
+    data = true
+  }
+
+  local project = function(item)
+    local acc = {}
+    for key, val in pairs(item) do
+      if item_fields[key] then
+        acc[key] = val
+      end
+    end
+    return acc
+  end
+
+  -- mirrors `coq/shared/fuzzy.py::multi_set_ratio`
+  local multi_set_ratio = function(lhs, rhs, look_ahead)
+    local shorter = math.min(#lhs, #rhs)
+    if shorter == 0 then
+      return 1
+    end
+    local cutoff = shorter + look_ahead
+    local avail = {}
+    for char in lhs:sub(1, cutoff):gmatch(".") do
+      avail[char] = (avail[char] or 0) + 1
+    end
+    local inter = 0
+    for char in rhs:sub(1, cutoff):gmatch(".") do
+      local n = avail[char]
+      if n and n > 0 then
+        avail[char] = n - 1
+        inter = inter + 1
+      end
+    end
+    return inter / shorter
+  end
+
+  -- mirrors `coq/clients/lsp/worker.py::_use_comp`, but only ever errs on keeping
+  local may_match = function(prefilter, text)
+    if type(text) ~= "string" or text:find("[\128-\255]") or text:find("^%s") then
+      return true
+    end
+    local l_text = text:lower()
+    for _, cword in ipairs(prefilter.cwords) do
+      if
+        cword:find("[\128-\255]") or
+          (#l_text + prefilter.look_ahead >= #cword and
+            multi_set_ratio(cword, l_text, prefilter.look_ahead) >=
+              prefilter.cutoff)
+       then
+        return true
+      end
+    end
+    return false
+  end
+
+  local keep = function(prefilter, item)
+    if not prefilter or type(item) ~= "table" then
+      return true
+    elseif type(item.filterText) == "string" then
+      return may_match(prefilter, item.filterText)
+    else
+      local edit = type(item.textEdit) == "table" and item.textEdit.newText
+      return may_match(prefilter, item.label) or
+        may_match(prefilter, edit or item.insertText or item.label)
+    end
+  end
+
+  COQ.lsp_pull = function(client, uid, idx, n, prefilter, projected)
     vim.validate {
       uid = {uid, "number"},
-      lo = {lo, "number"},
-      hi = {hi, "number"}
+      idx = {idx, "number"},
+      n = {n, "number"},
+      projected = {projected, "boolean"}
     }
+    if prefilter == vim.NIL then
+      prefilter = nil
+    end
+    vim.validate {prefilter = {prefilter, "table", true}}
 
     if uid > cid then
-      return {}
+      return {vim.NIL, {}}
     end
 
     local items = acc[client] or {}
     local a = {}
-    for i = lo, hi do
-      local item = items[i]
-      if item then
-        a[i - lo + 1] = item
-      else
-        break
+    while #a < n do
+      local item = items[idx]
+      if item == nil then
+        return {vim.NIL, a}
+      end
+      idx = idx + 1
+      if keep(prefilter, item) then
+        table.insert(a, projected and type(item) == "table" and project(item) or item)
       end
     end
 
-    return a
+    return {idx, a}
   end
 
   local lsp_notify = function(payload)
@@ -10,6 +10,7 @@ from dataclasses import dataclass, replace
 from functools import lru_cache
 from itertools import count
 from threading import Lock
+from time import monotonic
 from typing import (
     AbstractSet,
     Any,
@@ -26,7 +27,9 @@ from typing import (
 from pynvim_pp.logging import log
 from pynvim_pp.nvim import Nvim
 from pynvim_pp.types import NoneType
+from std2 import clamp
 from std2.pickle.decoder import new_decoder
+from std2.pickle.encoder import new_encoder
 
 from ...registry import NAMESPACE, rpc
 from ...server.rt_types import Stack
@@ -60,13 +63,31 @@ class _Payload:
     reply: Any
 
 
+@dataclass(frozen=True)
+class Prefilter:
+    """
+    Items that can not pass `_use_comp` against any of `cwords` stay in nvim
+
+    Only for `isIncomplete` replies, complete ones are cached whole for later edits
+    """
+
+    cwords: Sequence[str]
+    look_ahead: int
+    cutoff: float
+
+
 _DECODER = new_decoder[_Payload](_Payload)
+_ENCODER = new_encoder[Prefilter](Prefilter)
 _ENCODING_MAP: Mapping[Optional[str], Encoding] = {
     "utf8": UTF8,
     "utf16": UTF16,
     "utf32": UTF32,
 }
 
+_PAGE_TIME = 0.005
+_MIN_CHUNK = 20
+_MAX_CHUNK = 5000
+
 _LOCK = Lock()
 _STATE: MutableMapping[str, _Session] = {}
 
@@ -82,26 +103,40 @@ def _conds(_: str) -> Tuple[AbstractEventLoop, Condition]:
     return (loop, Condition())
 
 
+def _next_chunk(n: int, elapsed: float) -> int:
+    """
+    Aim for `_PAGE_TIME` per page, at most doubling / halving each time
+    """
+
+    want = int(n * _PAGE_TIME / elapsed) if elapsed else n * 2
+    return clamp(_MIN_CHUNK, clamp(n // 2, want, n * 2), _MAX_CHUNK)
+
+
+def _incomplete(message: Any) -> bool:
+    return isinstance(message, Mapping) and bool(message.get("isIncomplete"))
+
+
 async def _lsp_pull(
-    n: int, client: Optional[str], uid: int
+    n: int,
+    client: Optional[str],
+    uid: int,
+    prefilter: Optional[Prefilter],
+    projected: bool,
 ) -> AsyncIterator[Sequence[Any]]:
-    lo = 1
-    hi = n
-    while True:
-        part: Sequence[Any] = await Nvim.api.exec_lua(
+    p_filter = _ENCODER(prefilter) if prefilter else None
+    idx: Optional[int] = 1
+    while idx is not None:
+        t0 = monotonic()
+        idx, part = await Nvim.api.exec_lua(
             tuple,
             f"return {NAMESPACE}.lsp_pull(...)",
-            (client, uid, lo, hi),
+            (client, uid, idx, n, p_filter, projected),
         )
-        lo = hi + 1
-        hi = hi + n
-        length = hi - lo + 1
+        n = _next_chunk(n, elapsed=monotonic() - t0)
 
         assert isinstance(part, Sequence)
         yield part
         await sleep(0)
-        if len(part) < length:
-            break
 
 
 @rpc(blocking=False)
@@ -140,7 +175,12 @@ async def _lsp_notify(stack: Stack, rpayload: _Payload) -> None:
 
 
 async def async_request(
-    name: str, multipart: Optional[int], clients: AbstractSet[str], *args: Any
+    name: str,
+    multipart: Optional[int],
+    clients: AbstractSet[str],
+    *args: Any,
+    prefilter: Optional[Prefilter] = None,
+    projected: bool = False,
 ) -> AsyncIterator[_Client]:
     with timeit(f"LSP :: {name}"):
         (_, cond), uid = _conds(name), next(_uids(name))
@@ -167,7 +207,15 @@ async def async_request(
                         client, multipart = state.acc.pop()
                         if multipart:
                             async for part in _lsp_pull(
-                                multipart, client=client.name, uid=uid
+                                multipart,
+                                client=client.name,
+                                uid=uid,
+                                prefilter=(
+                                    prefilter
+                                    if _incomplete(client.message)
+                                    else None
+                                ),
+                                projected=projected,
                             ):
                                 if isinstance(
                                     client.message, MutableMapping
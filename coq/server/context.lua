@@ -0,0 +1,55 @@
+(function(...)
+  local utf_index = function(line, col)
+    if vim.fn.has("nvim-0.11") == 1 then
+      local utf16 = vim.str_utfindex(line, "utf-16", col)
+      local utf32 = vim.str_utfindex(line, "utf-32", col)
+      return utf16, utf32
+    else
+      local utf32, utf16 = vim.str_utfindex(line, col)
+      return utf16, utf32
+    end
+  end
+
+  COQ.ctx = function(known_buf, known_tick)
+    local win = vim.api.nvim_get_current_win()
+    local buf = vim.api.nvim_win_get_buf(win)
+    local tick = vim.api.nvim_buf_get_changedtick(buf)
+    local line_count = vim.api.nvim_buf_line_count(buf)
+    local win_size = math.floor(vim.api.nvim_win_get_height(win) / 2)
+    local row, col = unpack(vim.api.nvim_win_get_cursor(win))
+    row = row - 1
+
+    local lo, hi =
+      math.max(0, row - win_size),
+      math.min(line_count, row + win_size + 1)
+
+    local line = vim.api.nvim_buf_get_lines(buf, row, row + 1, true)[1]
+    local utf16_col, utf32_col = utf_index(line, col)
+
+    -- python side already has these lines
+    local lines = vim.NIL
+    if buf ~= known_buf or tick ~= known_tick then
+      lines = vim.api.nvim_buf_get_lines(buf, lo, hi, true)
+    end
+
+    return {
+      buf = buf,
+      tick = tick,
+      name = vim.api.nvim_buf_get_name(buf),
+      line_count = line_count,
+      filetype = vim.api.nvim_buf_get_option(buf, "filetype"),
+      commentstring = vim.api.nvim_buf_get_option(buf, "commentstring"),
+      fileformat = vim.api.nvim_buf_get_option(buf, "fileformat"),
+      tabstop = vim.api.nvim_buf_get_option(buf, "tabstop"),
+      expandtab = vim.api.nvim_buf_get_option(buf, "expandtab"),
+      scr_col = vim.fn.screencol(),
+      win_size = win_size,
+      lo = lo,
+      hi = hi,
+      cursor = {row, col, utf16_col, utf32_col},
+      line_before = line:sub(1, col),
+      line_after = line:sub(col + 1),
+      lines = lines
+    }
+  end
+end)(...)
@@ -1,64 +1,79 @@
+from dataclasses import dataclass
 from os.path import normcase
-from typing import Optional, Tuple, cast
+from typing import Any, Optional, Sequence
 
-from pynvim_pp.atomic import Atomic
-from pynvim_pp.buffer import Buffer, linefeed
-from pynvim_pp.lib import decode, encode
+from pynvim_pp.buffer import linefeed
 from pynvim_pp.nvim import Nvim
 from pynvim_pp.text_object import gen_split
-from pynvim_pp.types import NoneType
+from std2.pickle.decoder import new_decoder
 
-from ..consts import DEBUG
+from ..registry import NAMESPACE
+from ..shared.lines import BufLines
 from ..shared.parse import lower
 from ..shared.settings import MatchOptions
-from ..shared.types import UTF16, UTF32, ChangeEvent, Context
+from ..shared.types import ChangeEvent, Context, Cursors
 from .state import State
 
 
-async def context(
-    options: MatchOptions, state: State, change: Optional[ChangeEvent], manual: bool
-) -> Context:
-    with Atomic() as (atomic, ns):
-        ns.scr_col = atomic.call_function("screencol", ())
-        ns.win_height = atomic.win_get_height(0)
-        ns.buf = atomic.get_current_buf()
-        ns.name = atomic.buf_get_name(0)
-        ns.line_count = atomic.buf_line_count(0)
-        ns.filetype = atomic.buf_get_option(0, "filetype")
-        ns.commentstring = atomic.buf_get_option(0, "commentstring")
-        ns.fileformat = atomic.buf_get_option(0, "fileformat")
-        ns.tabstop = atomic.buf_get_option(0, "tabstop")
-        ns.expandtab = atomic.buf_get_option(0, "expandtab")
-        ns.cursor = atomic.win_get_cursor(0)
-        await atomic.commit(NoneType)
+@dataclass(frozen=True)
+class _Payload:
+    buf: int
+    tick: int
+    name: str
+    line_count: int
+    filetype: str
+    commentstring: str
+    fileformat: str
+    tabstop: int
+    expandtab: bool
+    scr_col: int
+    win_size: int
+    lo: int
+    hi: int
+    cursor: Cursors
+    line_before: str
+    line_after: str
+    lines: Optional[Sequence[str]]
 
-    scr_col = ns.scr_col(int)
-    win_size = ns.win_height(int) // 2
-    buf = ns.buf(Buffer)
-    (r, col) = cast(Tuple[int, int], ns.cursor(NoneType))
-    row = r - 1
-    pos = (row, col)
-    buf_line_count = ns.line_count(int)
-    filename = normcase(ns.name(str))
-    filetype = ns.filetype(str)
-    comment_str = ns.commentstring(str)
-    tabstop = ns.tabstop(int)
-    expandtab = ns.expandtab(bool)
-    linesep = linefeed(ns.fileformat(str))
 
-    lo = max(0, row - win_size)
-    hi = min(buf_line_count, row + win_size + 1)
-    lines = await buf.get_lines(lo=lo, hi=hi)
+_DECODER = new_decoder[_Payload](_Payload)
 
-    r = row - lo
-    line = lines[r]
-    lines_before, lines_after = lines[:r], lines[r + 1 :]
 
-    lhs, _, rhs = comment_str.partition("%s")
-    b_line = encode(line)
-    line_before, line_after = decode(b_line[:col]), decode(b_line[col:])
-    utf16_col = len(encode(line_before, encoding=UTF16)) // 2
-    utf32_col = len(encode(line_before, encoding=UTF32)) // 4
+async def _payload(known_buf: Optional[int], known_tick: Optional[int]) -> _Payload:
+    raw: Any = await Nvim.api.exec_lua(
+        dict, f"return {NAMESPACE}.ctx(...)", (known_buf, known_tick)
+    )
+    return _DECODER(raw)
+
+
+async def context(
+    options: MatchOptions,
+    buf_lines: BufLines,
+    state: State,
+    change: Optional[ChangeEvent],
+    manual: bool,
+) -> Context:
+    known_buf = state.context.buf_id
+    p = await _payload(known_buf, known_tick=buf_lines.tick(known_buf))
+    if (
+        lines := (
+            buf_lines.get(
+                p.buf, tick=p.tick, line_count=p.line_count, lo=p.lo, hi=p.hi
+            )
+            if p.lines is None
+            else p.lines
+        )
+    ) is None:
+        # Mirror moved on in between
+        p = await _payload(None, known_tick=None)
+        lines = p.lines
+        assert lines is not None
+
+    row, col, _, _ = p.cursor
+    r = row - p.lo
+    lines_before, lines_after = lines[:r], lines[r + 1 :]
+    lhs, _, rhs = p.commentstring.partition("%s")
+    line_before, line_after = p.line_before, p.line_after
 
     split = gen_split(
         lhs=line_before, rhs=line_after, unifying_chars=options.unifying_chars
@@ -67,33 +82,23 @@ async def context(
     l_syms_before, l_syms_after = lower(split.syms_lhs), lower(split.syms_rhs)
     is_lower = l_words_before + l_words_after == split.word_lhs + split.word_rhs
 
-    if DEBUG:
-        u32, u16 = cast(
-            Tuple[int, int],
-            await Nvim.api.exec_lua(
-                NoneType, "return {vim.str_utfindex(...)}", (line, col)
-            ),
-        )
-        assert utf16_col == u16
-        assert utf32_col == u32
-
     ctx = Context(
         manual=manual,
         change_id=state.change_id,
         commit_id=state.commit_id,
         cwd=state.cwd,
-        buf_id=buf.number,
-        filename=filename,
-        filetype=filetype,
-        line_count=buf_line_count,
-        linefeed=linesep,
-        tabstop=tabstop,
-        expandtab=expandtab,
+        buf_id=p.buf,
+        filename=normcase(p.name),
+        filetype=p.filetype,
+        line_count=p.line_count,
+        linefeed=linefeed(p.fileformat),
+        tabstop=p.tabstop,
+        expandtab=p.expandtab,
         comment=(lhs, rhs),
-        position=pos,
-        cursor=(row, col, utf16_col, utf32_col),
-        scr_col=scr_col,
-        win_size=win_size,
+        position=(row, col),
+        cursor=p.cursor,
+        scr_col=p.scr_col,
+        win_size=p.win_size,
         line=split.lhs + split.rhs,
         line_before=line_before,
         line_after=line_after,
@@ -563,6 +563,7 @@ async def edit(
 
             if not synthetic:
                 stack.idb.inserted(metric.instance.bytes, sort_by=metric.comp.sort_by)
+                stack.supervisor.deadlines.inserted(metric.instance)
 
             m_shift = await apply(buf=buf, instructions=instructions)
             if inserted:
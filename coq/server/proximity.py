@@ -0,0 +1,116 @@
+from collections import Counter
+from dataclasses import dataclass
+from itertools import chain
+from typing import (
+    AbstractSet,
+    Iterable,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from ..shared.parse import coalesce
+from ..shared.types import ChangeEvent
+
+_MAX_BUFS = 16
+
+
+@dataclass
+class _Window:
+    lo: int
+    lines: Sequence[Tuple[str, Sequence[str]]]
+    counts: Counter
+
+
+def _decr(counts: Counter, words: Iterable[str]) -> None:
+    for word in words:
+        if n := counts[word] - 1:
+            counts[word] = n
+        else:
+            counts.pop(word, None)
+
+
+def _realign(
+    window: _Window, change: Optional[ChangeEvent]
+) -> MutableMapping[int, Tuple[str, Sequence[str]]]:
+    """
+    Absolute line number -> cached line, as of after `change`
+
+    Lines inside of the changed range are dropped, lines after it are shifted
+    """
+
+    shifted: MutableMapping[int, Tuple[str, Sequence[str]]] = {}
+    dropped: MutableSequence[Sequence[str]] = []
+    delta = len(change.lines) - len(change.range) if change else 0
+    for row, cached in enumerate(window.lines, start=window.lo):
+        if not change or row < change.range.start:
+            shifted[row] = cached
+        elif row >= change.range.stop:
+            shifted[row + delta] = cached
+        else:
+            dropped.append(cached[1])
+
+    _decr(window.counts, words=chain.from_iterable(dropped))
+    return shifted
+
+
+class ProximityIndex:
+    """
+    Word counts of the visible window, per buffer
+
+    Only lines that changed, or scrolled into view, are re-tokenized
+    """
+
+    def __init__(self, unifying_chars: AbstractSet[str]) -> None:
+        self._unifying_chars = unifying_chars
+        self._windows: MutableMapping[int, _Window] = {}
+
+    def _tokenize(self, line: str) -> Sequence[str]:
+        return tuple(
+            coalesce(
+                self._unifying_chars,
+                include_syms=True,
+                backwards=False,
+                chars=line,
+            )
+        )
+
+    def update(
+        self,
+        buf_id: int,
+        lo: int,
+        lines: Sequence[str],
+        change: Optional[ChangeEvent],
+    ) -> Mapping[str, int]:
+        """
+        Move the window of `buf_id` to `lines`, starting at row `lo`
+        """
+
+        if window := self._windows.pop(buf_id, None):
+            cached = _realign(window, change=change)
+            counts = window.counts
+        else:
+            cached, counts = {}, Counter()
+
+        acc: MutableSequence[Tuple[str, Sequence[str]]] = []
+        for row, line in enumerate(lines, start=lo):
+            prev = cached.pop(row, None)
+            if prev and prev[0] == line:
+                acc.append(prev)
+            else:
+                if prev:
+                    _decr(counts, words=prev[1])
+                words = self._tokenize(line)
+                counts.update(words)
+                acc.append((line, words))
+
+        _decr(counts, words=chain.from_iterable(words for _, words in cached.values()))
+
+        self._windows[buf_id] = _Window(lo=lo, lines=acc, counts=counts)
+        while len(self._windows) > _MAX_BUFS:
+            self._windows.pop(next(iter(self._windows)))
+
+        return counts.copy()
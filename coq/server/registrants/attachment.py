@@ -35,7 +35,7 @@ async def _buf_enter(stack: Stack) -> None:
     buf_type = await buf.opts.get(str, "buftype")
 
     if listed and buf_type != "terminal":
-        if await Nvim.api.buf_attach(bool, buf, False, {}):
+        if await Nvim.api.buf_attach(bool, buf, True, {}):
             for worker in stack.workers:
                 if isinstance(worker, BufWorker):
                     filetype = await buf.filetype()
@@ -45,7 +45,12 @@ async def _buf_enter(stack: Stack) -> None:
                     line_count = await buf.line_count()
                     lo = max(0, row - height)
                     hi = min(line_count, row + height + 1)
-                    lines = await buf.get_lines(lo=lo, hi=hi)
+                    if (
+                        lines := stack.supervisor.lines.get(
+                            buf.number, tick=None, line_count=line_count, lo=lo, hi=hi
+                        )
+                    ) is None:
+                        lines = await buf.get_lines(lo=lo, hi=hi)
                     await worker.set_lines(
                         buf.number,
                         filetype=filetype,
@@ -73,10 +78,20 @@ async def _status() -> Tuple[str, str]:
     return mode, comp_mode
 
 
+@rpc(name="nvim_buf_changedtick_event")
+async def _changedtick_event(stack: Stack, buf: Buffer, change_tick: int) -> None:
+    stack.supervisor.lines.changedtick(buf.number, tick=change_tick)
+
+
+@rpc(name="nvim_buf_detach_event")
+async def _detach_event(stack: Stack, buf: Buffer) -> None:
+    stack.supervisor.lines.detach(buf.number)
+
+
 @rpc(name="nvim_buf_lines_event")
 async def _lines_event(
     stack: Stack,
-    _: Buffer,
+    buf: Buffer,
     change_tick: Optional[int],
     lo: int,
     hi: int,
@@ -84,11 +99,17 @@ async def _lines_event(
     pending: bool,
 ) -> None:
     t0 = monotonic()
+    # MUST be before the first `await`, to be in order with the RPC replies
+    stack.supervisor.lines.update(
+        buf.number, tick=change_tick, lo=lo, hi=hi, lines=lines
+    )
+
     if task := _CELL.val:
         _CELL.val = None
         await cancel(task)
 
-    if change_tick is not None:
+    # `hi` of `-1` is the whole buffer, sent on attach
+    if change_tick is not None and hi >= 0:
 
         async def cont() -> None:
             with suppress_and_log():
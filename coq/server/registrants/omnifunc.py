@@ -58,7 +58,11 @@ async def comp_func(
 ) -> None:
     with suppress_and_log():
         ctx = await context(
-            options=stack.settings.match, state=s, change=change, manual=manual
+            options=stack.settings.match,
+            buf_lines=stack.supervisor.lines,
+            state=s,
+            change=change,
+            manual=manual,
         )
         should = (
             _should_cont(
@@ -74,30 +78,39 @@ async def comp_func(
 
         if should:
             state(context=ctx)
+            shown: Optional[Sequence[UUID]] = None
+
+            async def show(metrics: Sequence[Metric]) -> None:
+                nonlocal shown
+                s = state()
+                if s.change_id == ctx.change_id:
+                    vim_comps = tuple(
+                        trans(
+                            stack,
+                            pum_width=s.pum_width,
+                            context=ctx,
+                            metrics=metrics,
+                        )
+                    )
+                    uids = tuple(metric.comp.uid for metric, _ in vim_comps)
+                    if uids != shown:
+                        shown = uids
+                        await complete(stack=stack, col=col, comps=vim_comps)
+
             metrics, _ = await gather(
-                stack.supervisor.collect(ctx),
+                stack.supervisor.collect(ctx, partial=show),
                 (
                     complete(stack=stack, col=col, comps=())
                     if stack.settings.display.pum.fast_close
                     else sleep(0)
                 ),
             )
-            s = state()
-            if s.change_id == ctx.change_id:
-                vim_comps = tuple(
-                    trans(
-                        stack,
-                        pum_width=s.pum_width,
-                        context=ctx,
-                        metrics=metrics,
-                    )
-                )
-                await complete(stack=stack, col=col, comps=vim_comps)
-                if DEBUG:
-                    t1 = monotonic()
-                    delta = t1 - t0
-                    msg = f"TOTAL >>> {si_prefixed_smol(delta, precision=0)}s".ljust(8)
-                    log.info("%s", msg)
+            await show(metrics)
+            if DEBUG:
+                t1 = monotonic()
+                delta = t1 - t0
+                msg = f"TOTAL >>> {si_prefixed_smol(delta, precision=0)}s".ljust(8)
+                log.info("%s", msg)
         else:
             await complete(stack=stack, col=col, comps=())
             state(inserted_pos=(-1, -1))
@@ -38,7 +38,15 @@ from ...registry import NAMESPACE, autocmd, rpc
 from ...shared.settings import GhostText, PreviewDisplay
 from ...shared.timeit import timeit
 from ...shared.trans import expand_tabs
-from ...shared.types import Completion, Context, Doc, Edit, ExternLSP, ExternPath
+from ...shared.types import (
+    Completion,
+    Context,
+    Doc,
+    Edit,
+    ExternLSP,
+    ExternPath,
+    LazyDoc,
+)
 from ..rt_types import Stack
 from ..state import State, state
 
@@ -217,11 +225,15 @@ async def _show_preview(stack: Stack, event: _Event, doc: Doc, s: State) -> None
             await _set_win(display=stack.settings.display.preview, buf=buf, pos=pos)
 
 
+def _materialize(doc: Union[Doc, LazyDoc, None]) -> Optional[Doc]:
+    return doc.thunk() if isinstance(doc, LazyDoc) else doc
+
+
 async def _resolve_comp(
     stack: Stack,
     event: _Event,
     extern: Union[ExternLSP, ExternPath],
-    maybe_doc: Optional[Doc],
+    maybe_doc: Union[Doc, LazyDoc, None],
     state: State,
 ) -> None:
     prev = _CELL.val
@@ -233,7 +245,7 @@ async def _resolve_comp(
 
         with suppress_and_log():
             if cached := stack.lru.get(state.preview_id):
-                doc = cached.doc
+                doc = _materialize(cached.doc)
             else:
                 if isinstance(extern, ExternLSP):
                     done, _ = await wait(
@@ -242,7 +254,8 @@ async def _resolve_comp(
                     )
                     if comp := (await done.pop()) if done else None:
                         stack.lru[state.preview_id] = comp
-                    doc = (comp.doc if comp else None) or maybe_doc
+                    resolved = _materialize(comp.doc) if comp else None
+                    doc = resolved or _materialize(maybe_doc)
                 elif isinstance(extern, ExternPath):
                     if doc := await show(
                         cwd=state.cwd,
@@ -329,11 +342,11 @@ async def _cmp_changed(stack: Stack, event: Mapping[str, Any] = {}) -> None:
                         maybe_doc=metric.comp.doc,
                         state=s,
                     )
-                elif metric.comp.doc and metric.comp.doc.text:
+                elif (doc := _materialize(metric.comp.doc)) and doc.text:
                     await _show_preview(
                         stack=stack,
                         event=ev,
-                        doc=metric.comp.doc,
+                        doc=doc,
                         s=s,
                     )
 
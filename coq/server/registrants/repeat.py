@@ -25,7 +25,11 @@ def _edit(prev: Edit) -> Optional[Edit]:
 @rpc()
 async def repeat(stack: Stack) -> None:
     ctx = await context(
-        options=stack.settings.match, state=state(), change=None, manual=True
+        options=stack.settings.match,
+        buf_lines=stack.supervisor.lines,
+        state=state(),
+        change=None,
+        manual=True,
     )
     s = state(context=ctx)
     metric = s.last_edit
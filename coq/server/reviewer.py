@@ -1,20 +1,27 @@
-from asyncio import get_running_loop, run_coroutine_threadsafe, wrap_future
-from collections import Counter
+from asyncio import get_running_loop
 from dataclasses import dataclass
-from itertools import chain
-from typing import Mapping
+from itertools import repeat
+from typing import (
+    Iterator,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    Sequence,
+    Tuple,
+)
 from uuid import UUID, uuid4
 
 from pynvim_pp.lib import display_width
 
 from ..databases.insertions.database import IDB
 from ..shared.context import cword_before
-from ..shared.fuzzy import MatchMetrics, metrics
-from ..shared.parse import coalesce, lower
+from ..shared.fuzzy import score_batch
+from ..shared.parse import lower
 from ..shared.runtime import Metric, PReviewer
 from ..shared.settings import BaseClient, Icons, MatchOptions, Weights
 from ..shared.types import Completion, Context
 from .icons import iconify
+from .proximity import ProximityIndex
 
 
 @dataclass(frozen=True)
@@ -27,18 +34,6 @@ class ReviewCtx:
     is_lower: bool
 
 
-def _metric(
-    options: MatchOptions,
-    ctx: ReviewCtx,
-    completion: Completion,
-) -> MatchMetrics:
-    match = lower(completion.sort_by) if ctx.is_lower else completion.sort_by
-    cword = cword_before(
-        options.unifying_chars, lower=ctx.is_lower, context=ctx.context, sort_by=match
-    )
-    return metrics(cword, match, look_ahead=options.look_ahead)
-
-
 def sigmoid(x: float) -> float:
     """
     x -> y ∈ (0.5, 1.5)
@@ -51,11 +46,12 @@ def _join(
     ctx: ReviewCtx,
     instance: UUID,
     completion: Completion,
-    match_metrics: MatchMetrics,
+    prefix_matches: int,
+    edit_distance: float,
 ) -> Metric:
     weight = Weights(
-        prefix_matches=match_metrics.prefix_matches,
-        edit_distance=match_metrics.edit_distance,
+        prefix_matches=prefix_matches,
+        edit_distance=edit_distance,
         recency=ctx.inserted.get(completion.sort_by, 0),
         proximity=ctx.proximity.get(completion.sort_by, 0),
     )
@@ -78,6 +74,7 @@ def _join(
 class Reviewer(PReviewer[ReviewCtx]):
     def __init__(self, options: MatchOptions, icons: Icons, db: IDB) -> None:
         self._options, self._icons, self._db = options, icons, db
+        self._proximity = ProximityIndex(options.unifying_chars)
         self._loop = get_running_loop()
 
     def s_register(self, assoc: BaseClient) -> None:
@@ -88,16 +85,13 @@ class Reviewer(PReviewer[ReviewCtx]):
 
     def begin(self, context: Context) -> ReviewCtx:
         inserted = self._db.insertion_order(n_rows=100)
-        words = chain.from_iterable(
-            coalesce(
-                self._options.unifying_chars,
-                include_syms=True,
-                backwards=None,
-                chars=line,
-            )
-            for line in context.lines
+        row, _ = context.position
+        proximity = self._proximity.update(
+            context.buf_id,
+            lo=row - len(context.lines_before),
+            lines=context.lines,
+            change=context.change,
         )
-        proximity = Counter(words)
 
         ctx = ReviewCtx(
             batch=uuid4(),
@@ -112,36 +106,64 @@ class Reviewer(PReviewer[ReviewCtx]):
     async def s_begin(
         self, token: ReviewCtx, assoc: BaseClient, instance: UUID
     ) -> None:
-        async def cont() -> None:
+        def cont() -> None:
             self._db.new_instance(
                 instance.bytes, source=assoc.short_name, batch_id=token.batch.bytes
             )
 
-        f = run_coroutine_threadsafe(cont(), loop=self._loop)
-        await wrap_future(f)
+        self._loop.call_soon_threadsafe(cont)
 
-    def trans(self, token: ReviewCtx, instance: UUID, completion: Completion) -> Metric:
-        new_completion = iconify(self._icons, completion=completion)
-        match_metrics = _metric(
-            self._options,
-            ctx=token,
-            completion=new_completion,
+    def trans(
+        self, token: ReviewCtx, batch: Sequence[Tuple[UUID, Completion]]
+    ) -> Iterator[Metric]:
+        completions = tuple(
+            iconify(self._icons, completion=completion) for _, completion in batch
         )
-        metric = _join(
-            token,
-            instance=instance,
-            completion=new_completion,
-            match_metrics=match_metrics,
+        matches = tuple(
+            lower(completion.sort_by) if token.is_lower else completion.sort_by
+            for completion in completions
         )
-        return metric
+
+        groups: MutableMapping[str, MutableSequence[int]] = {}
+        for idx, match in enumerate(matches):
+            cword = cword_before(
+                self._options.unifying_chars,
+                lower=token.is_lower,
+                context=token.context,
+                sort_by=match,
+            )
+            groups.setdefault(cword, []).append(idx)
+
+        p_matches = [*repeat(0, len(batch))]
+        e_dists = [*repeat(0.0, len(batch))]
+        for cword, idxs in groups.items():
+            scored = score_batch(
+                cword,
+                candidates=(matches[idx] for idx in idxs),
+                look_ahead=self._options.look_ahead,
+            )
+            for idx, p_match, e_dist in zip(
+                idxs, scored.prefix_matches, scored.edit_distances
+            ):
+                p_matches[idx], e_dists[idx] = p_match, e_dist
+
+        for (instance, _), completion, p_match, e_dist in zip(
+            batch, completions, p_matches, e_dists
+        ):
+            yield _join(
+                token,
+                instance=instance,
+                completion=completion,
+                prefix_matches=p_match,
+                edit_distance=e_dist,
+            )
 
     async def s_end(
         self, instance: UUID, interrupted: bool, elapsed: float, items: int
     ) -> None:
-        async def cont() -> None:
+        def cont() -> None:
             self._db.new_stat(
                 instance.bytes, interrupted=interrupted, duration=elapsed, items=items
             )
 
-        f = run_coroutine_threadsafe(cont(), loop=self._loop)
-        await wrap_future(f)
+        self._loop.call_soon_threadsafe(cont)
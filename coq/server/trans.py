@@ -1,7 +1,8 @@
-from dataclasses import asdict
+from functools import lru_cache
+from heapq import heapify, heappop
 from itertools import chain
 from locale import strxfrm
-from typing import Any, Callable, Iterable, Iterator, MutableSet, Sequence, Tuple
+from typing import Any, Iterable, Iterator, MutableSet, Sequence, Tuple
 
 from pynvim_pp.lib import display_width
 from std2 import clamp
@@ -14,48 +15,86 @@ from .rt_types import Stack
 from .state import state
 
 
-def _cum(adjustment: Weights, metrics: Iterable[Metric]) -> Weights:
-    zero = Weights(
-        prefix_matches=0,
-        edit_distance=0,
-        recency=0,
-        proximity=0,
+_Flat = Tuple[float, float, float, float]
+
+
+def _flat(weights: Weights) -> _Flat:
+    return (
+        weights.prefix_matches,
+        weights.edit_distance,
+        weights.recency,
+        weights.proximity,
     )
-    acc = asdict(zero)
-    for metric in metrics:
-        for key, val in asdict(metric.weight).items():
-            acc[key] += val
-    for key, val in asdict(adjustment).items():
-        if val:
-            acc[key] /= val
-        else:
-            acc[key] = 0
-    return Weights(**acc)
-
-
-def _sort_by(is_lower: bool, adjustment: Weights) -> Callable[[Metric], Any]:
-    adjust = asdict(adjustment)
-
-    def key_by(metric: Metric) -> Any:
-        tot = sum(
-            val / adjust[key] if adjust[key] else 0
-            for key, val in asdict(metric.weight).items()
-        )
-        key = (
-            -(metric.comp.always_on_top),
-            -(metric.comp.preselect),
+
+
+def _multipliers(adjustment: Weights, flat: Sequence[_Flat]) -> _Flat:
+    """
+    Each weight is normalized against its sum over the whole batch
+    """
+
+    s1 = s2 = s3 = s4 = 0.0
+    for w1, w2, w3, w4 in flat:
+        s1, s2, s3, s4 = s1 + w1, s2 + w2, s3 + w3, s4 + w4
+
+    m1, m2, m3, m4 = (
+        adj / tot if adj and tot else 0
+        for adj, tot in zip(_flat(adjustment), (s1, s2, s3, s4))
+    )
+    return m1, m2, m3, m4
+
+
+@lru_cache(maxsize=9999)
+def _collate(sort_by: str) -> str:
+    return strxfrm(sort_by)
+
+
+def _sort_keys(
+    is_lower: bool,
+    multipliers: _Flat,
+    metrics: Sequence[Metric],
+    flat: Sequence[_Flat],
+) -> Iterator[Tuple[Any, ...]]:
+    m1, m2, m3, m4 = multipliers
+    for idx, (metric, (w1, w2, w3, w4)) in enumerate(zip(metrics, flat)):
+        comp = metric.comp
+        tot = w1 * m1 + w2 * m2 + w3 * m3 + w4 * m4
+        yield (
+            -(comp.always_on_top),
+            -(comp.preselect),
             -round(tot * metric.weight_adjust * 10000),
-            -len(metric.comp.secondary_edits),
-            -(metric.comp.kind != ""),
-            -(metric.comp.doc is not None),
-            -metric.comp.sort_by[:1].isalnum(),
-            strxfrm(
-                metric.comp.sort_by.swapcase() if is_lower else metric.comp.sort_by
-            ),
+            -len(comp.secondary_edits),
+            -(comp.kind != ""),
+            -(comp.doc is not None),
+            -comp.sort_by[:1].isalnum(),
+            _collate(comp.sort_by.swapcase() if is_lower else comp.sort_by),
+            idx,
         )
-        return key
 
-    return key_by
+
+def _rank(
+    adjustment: Weights, is_lower: bool, lazy: bool, metrics: Sequence[Metric]
+) -> Iterator[Metric]:
+    """
+    When `lazy`, only the consumed prefix of the ranking is ever ordered
+    """
+
+    flat = tuple(_flat(metric.weight) for metric in metrics)
+    keys = [
+        *_sort_keys(
+            is_lower,
+            multipliers=_multipliers(adjustment, flat=flat),
+            metrics=metrics,
+            flat=flat,
+        )
+    ]
+    if lazy:
+        heapify(keys)
+        while keys:
+            *_, idx = heappop(keys)
+            yield metrics[idx]
+    else:
+        for *_, idx in sorted(keys):
+            yield metrics[idx]
 
 
 def _prune(
@@ -129,9 +168,12 @@ def trans(
     ellipsis_width = display_width(display.pum.ellipsis, tabsize=context.tabstop)
     truncate = clamp(pum_width, scr_width - context.scr_col, display.pum.x_max_len)
 
-    w_adjust = _cum(stack.settings.weights, metrics=metrics)
-    sortby = _sort_by(context.is_lower, adjustment=w_adjust)
-    ranked = sorted(metrics, key=sortby)
+    ranked = _rank(
+        stack.settings.weights,
+        is_lower=context.is_lower,
+        lazy=not context.manual,
+        metrics=metrics,
+    )
     pruned = tuple(_prune(stack, context=context, ranked=ranked))
     max_width = _max_width(pruned)
     for metric in pruned:
@@ -0,0 +1,89 @@
+from collections import deque
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Deque, MutableMapping, MutableSet, Optional
+from uuid import UUID
+
+from std2 import clamp
+
+_WINDOW = 100
+_MIN_SAMPLES = 20
+_QUANTILE = 0.95
+_SLACK = 1.25
+_USEFUL_RATE = 0.01
+# Every `_EXPLORE`th run is unbounded, so budgets can grow back
+_EXPLORE = 10
+
+
+@dataclass
+class _Source:
+    durations: Deque[float] = field(default_factory=lambda: deque(maxlen=_WINDOW))
+    instances: Deque[UUID] = field(default_factory=deque)
+    won: MutableSet[UUID] = field(default_factory=set)
+    budget: Optional[float] = None
+    runs: int = 0
+
+
+def _quantile(samples: Deque[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class Deadlines:
+    """
+    Rolling per source latency & usefulness, over the last `_WINDOW` runs
+
+    Each source is given enough time for its `_QUANTILE` latency,
+    sources that are almost never inserted from only get the minimum
+
+    Runs cut short say nothing of latency, they are recorded with `elapsed=None`,
+    and the occasional unbounded run lets slow or useless sources recover
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._sources: MutableMapping[str, _Source] = {}
+        self._instances: MutableMapping[UUID, str] = {}
+
+    def _source(self, source: str) -> _Source:
+        if not (src := self._sources.get(source)):
+            src = self._sources[source] = _Source()
+        return src
+
+    def record(self, source: str, instance: UUID, elapsed: Optional[float]) -> None:
+        """
+        `elapsed` of `None` counts towards usefulness, but not latency
+        """
+
+        with self._lock:
+            src = self._source(source)
+            if elapsed is not None:
+                src.durations.append(elapsed)
+            src.instances.append(instance)
+            self._instances[instance] = source
+            while len(src.instances) > _WINDOW:
+                dead = src.instances.popleft()
+                src.won.discard(dead)
+                self._instances.pop(dead, None)
+
+            if len(src.durations) < _MIN_SAMPLES:
+                src.budget = None
+            elif len(src.won) / len(src.instances) < _USEFUL_RATE:
+                src.budget = 0
+            else:
+                src.budget = _quantile(src.durations, q=_QUANTILE) * _SLACK
+
+    def inserted(self, instance: UUID) -> None:
+        with self._lock:
+            if source := self._instances.get(instance):
+                self._source(source).won.add(instance)
+
+    def budget(self, source: str, lo: float, hi: float) -> float:
+        with self._lock:
+            if src := self._sources.get(source):
+                budget = src.budget
+                src.runs += 1
+                explore = src.runs % _EXPLORE == 0
+            else:
+                budget, explore = None, False
+        return hi if budget is None or explore else clamp(lo, budget, hi)
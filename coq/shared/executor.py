@@ -13,32 +13,47 @@ from functools import lru_cache
 from shutil import which
 from subprocess import CalledProcessError
 from threading import Thread
-from typing import Any, Awaitable, Callable, Coroutine, Sequence, TypeVar
+from typing import Any, Awaitable, Callable, MutableSet, Sequence, TypeVar
 
+from pynvim_pp.logging import suppress_and_log
 from std2.asyncio.subprocess import call
 
 _T = TypeVar("_T")
 
 
 class AsyncExecutor:
+    """
+    An event loop on its own thread, can be shared by several workers
+    """
+
     def __init__(self, threadpool: ThreadPoolExecutor) -> None:
         f: Future = Future()
-        self._fut: Future = Future()
+        self._mains: MutableSet[Future] = set()
 
         async def cont() -> None:
             loop = get_running_loop()
             if threadpool:
                 loop.set_default_executor(threadpool)
             f.set_result(loop)
-            main: Coroutine = await wrap_future(self._fut)
-            await main
+            await loop.create_future()
 
         self._th = Thread(daemon=True, target=lambda: run(cont()))
         self._th.start()
         self.loop: AbstractEventLoop = f.result()
 
     def run(self, main: Awaitable[Any]) -> None:
-        self._fut.set_result(main)
+        async def cont() -> None:
+            await main
+
+        def done(fut: Future) -> None:
+            self._mains.discard(fut)
+            if not fut.cancelled():
+                with suppress_and_log():
+                    fut.result()
+
+        fut = run_coroutine_threadsafe(cont(), loop=self.loop)
+        self._mains.add(fut)
+        fut.add_done_callback(done)
 
     def fsubmit(self, f: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
         fut: Future = Future()
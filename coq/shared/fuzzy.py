@@ -1,7 +1,9 @@
+from array import array
 from collections import Counter
 from dataclasses import dataclass
+from functools import lru_cache
 from itertools import repeat
-from typing import Iterable, MutableMapping, MutableSequence, Tuple
+from typing import Iterable, Mapping, MutableMapping, Sequence, Tuple
 
 
 @dataclass(frozen=True)
@@ -10,6 +12,12 @@ class MatchMetrics:
     edit_distance: float
 
 
+@dataclass(frozen=True)
+class BatchMetrics:
+    prefix_matches: Sequence[int]
+    edit_distances: Sequence[float]
+
+
 def _p_matches(lhs: Iterable[str], rhs: Iterable[str]) -> int:
     p_matches = 0
     for l, r in zip(lhs, rhs):
@@ -20,9 +28,31 @@ def _p_matches(lhs: Iterable[str], rhs: Iterable[str]) -> int:
     return p_matches
 
 
+@lru_cache(maxsize=256)
+def _char_counts(text: str) -> Mapping[str, int]:
+    return Counter(text)
+
+
+def _intersection(counts: Mapping[str, int], text: str) -> int:
+    """
+    `counts` is shared, only ever read
+    """
+
+    used: MutableMapping[str, int] = {}
+    inter = 0
+    for char in text:
+        n = used.get(char, 0)
+        if n < counts.get(char, 0):
+            used[char] = n + 1
+            inter += 1
+    return inter
+
+
 def multi_set_ratio(lhs: str, rhs: str, look_ahead: int) -> float:
     """
     Test intersection size, adjust for length
+
+    `lhs` is expected to be the query side, its counts are cached across rows
     """
 
     shorter = min(len(lhs), len(rhs))
@@ -31,14 +61,7 @@ def multi_set_ratio(lhs: str, rhs: str, look_ahead: int) -> float:
     else:
         cutoff = shorter + look_ahead
         l, r = lhs[:cutoff], rhs[:cutoff]
-        longer = max(len(l), len(r))
-
-        l_c, r_c = Counter(l), Counter(r)
-        dif = l_c - r_c if len(l) > len(r) else r_c - l_c
-
-        ratio = 1 - sum(dif.values()) / longer
-        adjust = shorter / longer
-        return ratio / adjust
+        return _intersection(_char_counts(l), text=r) / shorter
 
 
 def quick_ratio(lhs: str, rhs: str, look_ahead: int) -> float:
@@ -58,10 +81,6 @@ def quick_ratio(lhs: str, rhs: str, look_ahead: int) -> float:
         return l_ratio + r_ratio * 0.5
 
 
-_ARRAY_CACHE: MutableMapping[Tuple[int, int], MutableSequence[int]] = {}
-_DA: MutableMapping[str, int] = {}
-
-
 def dl_distance(lhs: str, rhs: str) -> int:
     """
     Modified from
@@ -72,10 +91,9 @@ def dl_distance(lhs: str, rhs: str) -> int:
     len_l, len_r = len(lhs), len(rhs)
     row_size = len_r + 2
     max_d = len_l + len_r
-    _DA.clear()
+    da: MutableMapping[str, int] = {}
 
-    if not (d := _ARRAY_CACHE.get((len_l, len_r))):
-        d = [*repeat(0, row_size * (len_l + 2))]
+    d = [*repeat(0, row_size * (len_l + 2))]
 
     d[0] = max_d
     for i in range(0, len_l + 1):
@@ -90,7 +108,7 @@ def dl_distance(lhs: str, rhs: str) -> int:
     for i in range(1, len_l + 1):
         db = 0
         for j in range(1, len_r + 1):
-            i1 = _DA.get(rhs[j - 1], 0)
+            i1 = da.get(rhs[j - 1], 0)
             j1 = db
 
             if lhs[i - 1] == rhs[j - 1]:
@@ -105,25 +123,119 @@ def dl_distance(lhs: str, rhs: str) -> int:
                 d[row_size * i + j + 1] + 1,
                 d[row_size * i1 + j1] + (i - i1 - 1) + 1 + (j - j1 - 1),
             )
-        _DA[lhs[i - 1]] = i
+        da[lhs[i - 1]] = i
 
     return d[row_size * (len_l + 1) + len_r + 1]
 
 
-def metrics(lhs: str, rhs: str, look_ahead: int) -> MatchMetrics:
+@lru_cache(maxsize=64)
+def char_masks(pattern: str) -> Mapping[str, int]:
     """
-    Front end bias
+    Positional bitmask of each char in pattern, computed once per `cword`
+    """
+
+    masks: MutableMapping[str, int] = {}
+    for idx, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | 1 << idx
+    return masks
+
+
+def _osa_distance(masks: Mapping[str, int], offset: int, width: int, rhs: str) -> int:
+    """
+    Hyyrö's bit-vector optimal string alignment distance
+
+    Pattern is `[offset, offset + width)` of the string `masks` are computed from
+    """
+
+    if not width:
+        return len(rhs)
+    else:
+        full = (1 << width) - 1
+        last = 1 << (width - 1)
+        vp, vn, d0, prev = full, 0, 0, 0
+        dist = width
+
+        for char in rhs:
+            pm = (masks.get(char, 0) >> offset) & full
+            tr = ((~d0 & pm) << 1) & prev
+            d0 = ((((pm & vp) + vp) ^ vp) | pm | vn | tr) & full
+            hp = vn | (~(d0 | vp) & full)
+            hn = d0 & vp
+
+            if hp & last:
+                dist += 1
+            elif hn & last:
+                dist -= 1
+
+            hp = ((hp << 1) | 1) & full
+            hn = (hn << 1) & full
+            vp = hn | (~(d0 | hp) & full)
+            vn = hp & d0
+            prev = pm
+
+        return dist
+
+
+def _bag_distance(lhs: str, rhs: str) -> int:
+    l_c, r_c = Counter(lhs), Counter(rhs)
+    return max(sum((l_c - r_c).values()), sum((r_c - l_c).values()))
+
+
+def bp_distance(masks: Mapping[str, int], offset: int, lhs: str, rhs: str) -> int:
+    """
+    Same result as `dl_distance(lhs, rhs)`, `lhs` being a slice of the masked pattern
+
+    bag distance <= DL <= OSA, and DL == OSA whenever OSA <= 2,
+    only fall back to the quadratic DL when the bounds are not tight
     """
 
+    dist = _osa_distance(masks, offset=offset, width=len(lhs), rhs=rhs)
+    if dist <= 2 or dist == _bag_distance(lhs, rhs):
+        return dist
+    else:
+        return dl_distance(lhs, rhs)
+
+
+def _metrics(
+    masks: Mapping[str, int], lhs: str, rhs: str, look_ahead: int
+) -> Tuple[int, float]:
     shorter = min(len(lhs), len(rhs))
     if not shorter:
-        return MatchMetrics(prefix_matches=0, edit_distance=0)
+        return 0, 0
     else:
         p_matches = _p_matches(lhs, rhs)
         cutoff = min(max(len(lhs), len(rhs)), shorter + look_ahead)
         more = cutoff - shorter
         l, r = lhs[p_matches:cutoff], rhs[p_matches:cutoff]
 
-        dist = dl_distance(l, r)
+        dist = bp_distance(masks, offset=p_matches, lhs=l, rhs=r)
         edit_dist = 1 - (dist - more) / shorter
-        return MatchMetrics(prefix_matches=p_matches, edit_distance=edit_dist)
+        return p_matches, edit_dist
+
+
+def metrics(lhs: str, rhs: str, look_ahead: int) -> MatchMetrics:
+    """
+    Front end bias
+    """
+
+    p_matches, edit_dist = _metrics(
+        char_masks(lhs), lhs=lhs, rhs=rhs, look_ahead=look_ahead
+    )
+    return MatchMetrics(prefix_matches=p_matches, edit_distance=edit_dist)
+
+
+def score_batch(cword: str, candidates: Iterable[str], look_ahead: int) -> BatchMetrics:
+    """
+    `metrics` for many candidates against the same `cword`
+    """
+
+    masks = char_masks(cword)
+    p_acc, e_acc = array("L"), array("d")
+    for match in candidates:
+        p_matches, edit_dist = _metrics(
+            masks, lhs=cword, rhs=match, look_ahead=look_ahead
+        )
+        p_acc.append(p_matches)
+        e_acc.append(edit_dist)
+
+    return BatchMetrics(prefix_matches=p_acc, edit_distances=e_acc)
@@ -0,0 +1,69 @@
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import MutableMapping, MutableSequence, Optional, Sequence
+
+
+@dataclass
+class _Buf:
+    tick: Optional[int] = None
+    lines: MutableSequence[str] = field(default_factory=list)
+
+
+class BufLines:
+    """
+    Mirror of attached buffers, kept up to date by `nvim_buf_lines_event`
+
+    Reads are refused, whenever the mirror could be behind the buffer
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._bufs: MutableMapping[int, _Buf] = {}
+
+    def update(
+        self, buf_id: int, tick: Optional[int], lo: int, hi: int, lines: Sequence[str]
+    ) -> None:
+        with self._lock:
+            if hi < 0:
+                self._bufs[buf_id] = _Buf(tick=tick, lines=[*lines])
+            elif buf := self._bufs.get(buf_id):
+                buf.lines[lo:hi] = lines
+                if tick is not None:
+                    buf.tick = tick
+
+    def changedtick(self, buf_id: int, tick: int) -> None:
+        with self._lock:
+            if buf := self._bufs.get(buf_id):
+                buf.tick = tick
+
+    def detach(self, buf_id: int) -> None:
+        with self._lock:
+            self._bufs.pop(buf_id, None)
+
+    def tick(self, buf_id: int) -> Optional[int]:
+        with self._lock:
+            buf = self._bufs.get(buf_id)
+            return buf.tick if buf else None
+
+    def get(
+        self,
+        buf_id: int,
+        tick: Optional[int],
+        line_count: int,
+        lo: int,
+        hi: int,
+    ) -> Optional[Sequence[str]]:
+        """
+        `tick` of `None` only checks the `line_count`
+        """
+
+        with self._lock:
+            buf = self._bufs.get(buf_id)
+            if (
+                buf
+                and len(buf.lines) == line_count
+                and (tick is None or buf.tick == tick)
+            ):
+                return tuple(buf.lines[lo:hi])
+            else:
+                return None
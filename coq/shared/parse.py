@@ -58,3 +58,25 @@ def tokenize(
         unifying_chars, include_syms=include_syms, backwards=None, chars=text
     )
     return islice(words, tokenization_limit)
+
+
+def tokenize_lines(
+    unifying_chars: AbstractSet[str], include_syms: bool, lines: Sequence[str]
+) -> Sequence[str]:
+    """
+    Words of each line, joined by spaces
+
+    Words never contain whitespace, and flat strings are cheap to send across processes
+    """
+
+    return tuple(
+        " ".join(
+            coalesce(
+                unifying_chars,
+                include_syms=include_syms,
+                backwards=False,
+                chars=line,
+            )
+        )
+        for line in lines
+    )
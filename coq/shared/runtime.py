@@ -7,7 +7,9 @@ from asyncio import (
     Task,
     as_completed,
     create_task,
+    ensure_future,
     gather,
+    get_running_loop,
     run_coroutine_threadsafe,
     wait,
     wrap_future,
@@ -16,16 +18,26 @@ from asyncio.exceptions import CancelledError
 from asyncio.tasks import FIRST_COMPLETED
 from collections import deque
 from concurrent.futures import Future as CFuture
-from concurrent.futures import InvalidStateError, ThreadPoolExecutor
+from concurrent.futures import (
+    InvalidStateError,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
 from contextlib import contextmanager, suppress
 from dataclasses import dataclass
+from itertools import count
+from multiprocessing import get_context
+from os import cpu_count
 from pathlib import Path
 from threading import Lock
 from time import monotonic
 from typing import (
+    AbstractSet,
     Any,
     AsyncIterator,
     Awaitable,
+    Callable,
+    ClassVar,
     Coroutine,
     Deque,
     Generic,
@@ -34,6 +46,7 @@ from typing import (
     Optional,
     Protocol,
     Sequence,
+    Tuple,
     TypeVar,
 )
 from uuid import UUID, uuid4
@@ -43,7 +56,11 @@ from pynvim_pp.logging import suppress_and_log
 from std2.aitertools import aenumerate
 from std2.asyncio import cancel
 
+from .deadlines import Deadlines
 from .executor import AsyncExecutor
+from .fuzzy import quick_ratio
+from .lines import BufLines
+from .parse import lower
 from .settings import (
     BaseClient,
     CompleteOptions,
@@ -53,12 +70,15 @@ from .settings import (
     Weights,
 )
 from .timeit import TracingLocker, timeit
-from .types import Completion, Context, Interruptible
+from .types import BaseRangeEdit, Completion, Context, Interruptible
+from .watcher import Watcher
 
 _T = TypeVar("_T")
 _T_co = TypeVar("_T_co", contravariant=True)
 _O_co = TypeVar("_O_co", contravariant=True, bound=BaseClient)
 
+_CHUNK_SIZE = 64
+
 
 @dataclass(frozen=True)
 class Metric:
@@ -77,13 +97,97 @@ class PReviewer(Protocol[_T]):
 
     async def s_begin(self, token: _T, assoc: BaseClient, instance: UUID) -> None: ...
 
-    def trans(self, token: _T, instance: UUID, completion: Completion) -> Metric: ...
+    def trans(
+        self, token: _T, batch: Sequence[Tuple[UUID, Completion]]
+    ) -> Iterator[Metric]: ...
 
     async def s_end(
         self, instance: UUID, interrupted: bool, elapsed: float, items: int
     ) -> None: ...
 
 
+def _drain(
+    reviewer: PReviewer,
+    token: Any,
+    pending: Deque[Tuple[UUID, Completion]],
+    acc: MutableSequence[Metric],
+) -> None:
+    batch: MutableSequence[Tuple[UUID, Completion]] = []
+    with suppress(IndexError):
+        for _ in range(len(pending)):
+            batch.append(pending.popleft())
+    if batch:
+        acc.extend(reviewer.trans(token, batch=batch))
+
+
+@dataclass(frozen=True)
+class _PrefixCache:
+    context: Context
+    completions: Sequence[Completion]
+
+
+def _extends(prev: Context, cur: Context) -> bool:
+    """
+    Only new characters were typed at the end of the previous word
+    """
+
+    (p_row, _), (c_row, _) = prev.position, cur.position
+    return (
+        not cur.manual
+        and cur.commit_id == prev.commit_id
+        and cur.buf_id == prev.buf_id
+        and c_row == p_row
+        and cur.line_after == prev.line_after
+        and len(cur.line_before) > len(prev.line_before)
+        and cur.line_before.startswith(prev.line_before)
+        and prev.words_before != ""
+        and cur.words_before.startswith(prev.words_before)
+        and cur.syms_before.startswith(prev.syms_before)
+    )
+
+
+def _complete(
+    match: MatchOptions, context: Context, completions: Sequence[Completion]
+) -> bool:
+    """
+    Results cut off by `max_results`, or tied to the cursor, can not be refiltered
+    """
+
+    return (context.manual or len(completions) < match.max_results) and not any(
+        isinstance(completion.primary_edit, BaseRangeEdit) or completion.secondary_edits
+        for completion in completions
+    )
+
+
+def refilter(
+    match: MatchOptions,
+    context: Context,
+    completion: Completion,
+    syms: bool,
+    drop_prefixes: bool,
+) -> bool:
+    """
+    Same filter as the word bank queries
+
+    `syms` for sources that also query by `context.syms`,
+    `drop_prefixes` for those that leave out words already typed in full
+    """
+
+    sort_by = completion.sort_by
+    l_sort_by = lower(sort_by)
+    for typed in (context.words, context.syms if syms else ""):
+        if (
+            typed
+            and len(sort_by) + match.look_ahead >= len(typed)
+            and not (drop_prefixes and sort_by == typed[: len(sort_by)])
+            and l_sort_by.startswith(lower(typed[: match.exact_matches]))
+            and quick_ratio(lower(typed), l_sort_by, look_ahead=match.look_ahead)
+            > match.fuzzy_cutoff
+        ):
+            return True
+    return False
+
+
 class Supervisor:
     def __init__(
         self,
@@ -101,12 +205,56 @@ class Supervisor:
         self._reviewer = reviewer
 
         self.threadpool = th
+        self.deadlines = Deadlines()
+        self.lines = BufLines()
+        self.watcher = Watcher()
+        self.procpool = (
+            ProcessPoolExecutor(
+                max_workers=limits.worker_processes, mp_context=get_context("spawn")
+            )
+            if limits.worker_processes
+            else None
+        )
+        self._executors: MutableSequence[AsyncExecutor] = []
+        self._io_executor: Optional[AsyncExecutor] = None
+        self._assigned = count()
         self._thread_lock = Lock()
         self._workers: WeakSet[Worker] = WeakSet()
 
         self._lock = TracingLocker(name="Supervisor", force=True)
         self._work_task: Optional[Task] = None
 
+    def executor(self, io_bound: bool) -> AsyncExecutor:
+        """
+        CPU bound workers are spread over `worker_threads` event loops,
+        I/O bound workers all share one more
+        """
+
+        threads = self.limits.worker_threads
+        size = (cpu_count() or 1) if threads is None else threads
+        with self._thread_lock:
+            if not size:
+                return AsyncExecutor(self.threadpool)
+            elif io_bound:
+                if not self._io_executor:
+                    self._io_executor = AsyncExecutor(self.threadpool)
+                return self._io_executor
+            else:
+                idx = next(self._assigned) % size
+                if idx >= len(self._executors):
+                    self._executors.append(AsyncExecutor(self.threadpool))
+                return self._executors[idx]
+
+    async def offload(self, f: Callable[..., _T], *args: Any) -> _T:
+        """
+        `f` and `args` must be picklable, runs inline without `worker_processes`
+        """
+
+        if pool := self.procpool:
+            return await get_running_loop().run_in_executor(pool, f, *args)
+        else:
+            return f(*args)
+
     def register(self, worker: Worker, assoc: BaseClient) -> None:
         with suppress_and_log():
             self._reviewer.s_register(assoc)
@@ -124,7 +272,16 @@ class Supervisor:
         if task:
             await cancel(task)
 
-    def collect(self, context: Context) -> Awaitable[Sequence[Metric]]:
+    def collect(
+        self,
+        context: Context,
+        partial: Optional[Callable[[Sequence[Metric]], Awaitable[None]]] = None,
+    ) -> Awaitable[Sequence[Metric]]:
+        """
+        `partial` receives snapshots of the results so far,
+        starting at `completion_first_paint`, and then as each late worker finishes
+        """
+
         now = monotonic()
         timeout = (
             self.limits.completion_manual_timeout
@@ -132,6 +289,45 @@ class Supervisor:
             else self.limits.completion_auto_timeout
         )
 
+        def bounded(worker: Worker, fut: Future) -> Future:
+            if context.manual or not self.limits.completion_adaptive_deadlines:
+                return fut
+            else:
+                budget = self.deadlines.budget(
+                    worker._options.short_name,
+                    lo=self.limits.completion_first_paint,
+                    hi=timeout,
+                )
+                if budget >= timeout:
+                    return fut
+
+                async def cont() -> None:
+                    try:
+                        await wait((fut,), timeout=budget - (monotonic() - now))
+                    finally:
+                        await cancel(fut)
+
+                return ensure_future(cont())
+
+        async def stream(
+            token: Any,
+            tasks: AbstractSet[Future],
+            chunks: Deque[Tuple[UUID, Completion]],
+            acc: Deque[Metric],
+        ) -> AbstractSet[Future]:
+            assert partial
+            painted = 0
+            _, pending = await wait(tasks, timeout=self.limits.completion_first_paint)
+            while pending and (remaining := timeout - (monotonic() - now)) > 0:
+                _drain(self._reviewer, token=token, pending=chunks, acc=acc)
+                if len(acc) != painted:
+                    painted = len(acc)
+                    await partial(tuple(acc))
+                _, pending = await wait(
+                    pending, timeout=remaining, return_when=FIRST_COMPLETED
+                )
+            return pending
+
         async def cont(prev: Optional[Task]) -> Sequence[Metric]:
             with timeit("CANCEL -- ALL"):
                 if prev:
@@ -140,21 +336,34 @@ class Supervisor:
             with suppress_and_log(), timeit("COLLECTED -- ALL"):
                 async with self._lock:
                     acc: Deque[Metric] = deque()
+                    chunks: Deque[Tuple[UUID, Completion]] = deque()
 
                     token = self._reviewer.begin(context)
-                    tasks = tuple(
-                        worker.supervised(context, token=token, now=now, acc=acc)
+                    tasks = {
+                        bounded(
+                            worker,
+                            fut=worker.supervised(
+                                context, token=token, now=now, pending=chunks, acc=acc
+                            ),
+                        )
                         for worker in self._workers
-                    )
+                    }
+
+                    if partial and self.limits.completion_first_paint < timeout:
+                        pending = await stream(
+                            token, tasks=tasks, chunks=chunks, acc=acc
+                        )
+                    else:
+                        _, pending = await wait(tasks, timeout=timeout)
 
-                    _, pending = await wait(tasks, timeout=timeout)
-                    if not acc:
+                    if not acc and not chunks:
                         for fut in as_completed(pending):
                             await fut
-                            if acc:
+                            if acc or chunks:
                                 break
 
                     await cancel(*pending)
+                    _drain(self._reviewer, token=token, pending=chunks, acc=acc)
                     return acc
 
         self._work_task = task = create_task(cont(self._work_task))
@@ -162,11 +371,14 @@ class Supervisor:
 
 
 class Worker(Interruptible, Generic[_O_co, _T_co]):
+    # Mostly waits on other processes, instead of sqlite or fuzzy matching
+    io_bound: ClassVar[bool] = False
+
     @classmethod
     def init(
         cls, supervisor: Supervisor, options: _O_co, misc: _T_co
     ) -> Worker[_O_co, _T_co]:
-        ex = AsyncExecutor(supervisor.threadpool)
+        ex = supervisor.executor(cls.io_bound)
         fut = ex.fsubmit(
             lambda: cls(ex, supervisor=supervisor, options=options, misc=misc)
         )
@@ -188,6 +400,7 @@ class Worker(Interruptible, Generic[_O_co, _T_co]):
         self._interrupt_lock = Lock()
         self._interrupt_fut: CFuture = CFuture()
         self._interrupt_token = ()
+        self._prefix_cache: Optional[_PrefixCache] = None
         self._supervisor.register(self, assoc=options)
 
     @contextmanager
@@ -208,6 +421,31 @@ class Worker(Interruptible, Generic[_O_co, _T_co]):
     @abstractmethod
     def _work(self, context: Context) -> AsyncIterator[Completion]: ...
 
+    async def _side_effects(self, context: Context) -> None:
+        """
+        Whatever else `_work` does with `context`, run instead on a prefix cache hit
+        """
+
+    def _matches(self, context: Context, completion: Completion) -> bool:
+        """
+        Must agree with the query `_work` runs, for the prefix cache
+        """
+
+        return refilter(
+            self._supervisor.match,
+            context=context,
+            completion=completion,
+            syms=True,
+            drop_prefixes=True,
+        )
+
+    async def _refiltered(
+        self, context: Context, cache: Sequence[Completion]
+    ) -> AsyncIterator[Completion]:
+        for completion in cache:
+            if self._matches(context, completion=completion):
+                yield completion
+
     async def idle(self) -> None:
         async def cont() -> None:
             async with self._idle:
@@ -220,6 +458,7 @@ class Worker(Interruptible, Generic[_O_co, _T_co]):
         context: Context,
         token: Any,
         now: float,
+        pending: Deque[Tuple[UUID, Completion]],
         acc: MutableSequence[Metric],
     ) -> Future:
         prev = self._work_fut
@@ -233,23 +472,45 @@ class Worker(Interruptible, Generic[_O_co, _T_co]):
                     await cancel(wrap_future(prev))
 
             with suppress_and_log(), timeit(f"WORKER -- {self._options.short_name}"):
-                await self._supervisor._reviewer.s_begin(
-                    token, assoc=self._options, instance=instance
+                reviewer = self._supervisor._reviewer
+                await reviewer.s_begin(token, assoc=self._options, instance=instance)
+
+                cache, self._prefix_cache = self._prefix_cache, None
+                refiltered = bool(cache and _extends(cache.context, cur=context))
+                if refiltered:
+                    await self._side_effects(context)
+                completions = (
+                    self._refiltered(context, cache=cache.completions)
+                    if cache and refiltered
+                    else self._work(context)
                 )
+                collected: MutableSequence[Completion] = []
                 try:
-                    async for items, completion in aenumerate(
-                        self._work(context), start=1
+                    async for items, completion in aenumerate(completions, start=1):
+                        collected.append(completion)
+                        pending.append((instance, completion))
+                        if len(pending) >= _CHUNK_SIZE:
+                            _drain(reviewer, token=token, pending=pending, acc=acc)
+
+                    if self._options.prefix_cache and _complete(
+                        self._supervisor.match, context=context, completions=collected
                     ):
-                        metric = self._supervisor._reviewer.trans(
-                            token, instance=instance, completion=completion
+                        self._prefix_cache = _PrefixCache(
+                            context=context, completions=collected
                         )
-                        acc.append(metric)
                 except CancelledError:
                     interrupted = True
                     raise
                 finally:
+                    _drain(reviewer, token=token, pending=pending, acc=acc)
                     elapsed = monotonic() - now
-                    await self._supervisor._reviewer.s_end(
+                    self._supervisor.deadlines.record(
+                        self._options.short_name,
+                        instance=instance,
+                        # Only whole, real queries are a measure of latency
+                        elapsed=None if refiltered or interrupted else elapsed,
+                    )
+                    await reviewer.s_end(
                         instance,
                         interrupted=interrupted,
                         elapsed=elapsed,
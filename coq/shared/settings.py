@@ -10,10 +10,14 @@ from pynvim_pp.float_win import Border
 class Limits:
     tokenization_limit: int
     idle_timeout: float
+    completion_adaptive_deadlines: bool
     completion_auto_timeout: float
+    completion_first_paint: float
     completion_manual_timeout: float
     download_retries: int
     download_timeout: float
+    worker_processes: int
+    worker_threads: Optional[int]
 
 
 @dataclass(frozen=True)
@@ -137,6 +141,7 @@ class _AlwaysTops:
 @dataclass(frozen=True)
 class BaseClient:
     enabled: bool
+    prefix_cache: bool
     short_name: str
     weight_adjust: float
 
@@ -161,17 +166,23 @@ class PathsClient(BaseClient, _AlwaysTop):
 @dataclass(frozen=True)
 class BuffersClient(_WordbankClient, _AlwaysTop):
     same_filetype: bool
+    memory_index: bool
     parent_scope: str
 
 
 @dataclass(frozen=True)
-class TagsClient(BaseClient, _AlwaysTop):
+class _ScopedClient(BaseClient):
     parent_scope: str
     path_sep: str
 
 
 @dataclass(frozen=True)
-class TmuxClient(_WordbankClient, TagsClient, _AlwaysTop):
+class TagsClient(_ScopedClient, _AlwaysTop):
+    crawl: bool
+
+
+@dataclass(frozen=True)
+class TmuxClient(_WordbankClient, _ScopedClient, _AlwaysTop):
     all_sessions: bool
 
 
@@ -168,6 +168,15 @@ class Doc:
     syntax: str
 
 
+@dataclass(frozen=True)
+class LazyDoc:
+    """
+    Only built if previewed, which most completions never are
+    """
+
+    thunk: Callable[[], Optional[Doc]]
+
+
 @dataclass(frozen=True)
 class ExternLSP:
     client: Optional[str]
@@ -200,7 +209,7 @@ class Completion:
     secondary_edits: Sequence[RangeEdit] = ()
     preselect: bool = False
     kind: str = ""
-    doc: Optional[Doc] = None
+    doc: Union[Doc, LazyDoc, None] = None
     extern: Union[ExternLSP, ExternLUA, ExternPath, None] = None
 
 
@@ -0,0 +1,211 @@
+from contextlib import suppress
+from ctypes import CDLL, get_errno
+from ctypes.util import find_library
+from dataclasses import dataclass, field
+from os import close, fsdecode, fsencode, read, strerror
+from os.path import dirname, join, normcase
+from struct import Struct
+from threading import Lock, Thread
+from typing import (
+    AbstractSet,
+    Callable,
+    Hashable,
+    MutableMapping,
+    MutableSet,
+    Optional,
+)
+
+from pynvim_pp.logging import log
+from std2.platform import OS, os
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_CLOEXEC = 0o2000000
+
+_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+
+_GONE = _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_IGNORED
+
+# struct inotify_event {int wd; uint32_t mask, cookie, len; char name[];}
+_EVENT = Struct("iIII")
+_BUF_SIZE = 2**16
+
+
+class _Inotify:
+    def __init__(self) -> None:
+        self._libc = CDLL(find_library("c"), use_errno=True)
+        fd = self._libc.inotify_init1(_IN_CLOEXEC)
+        if fd < 0:
+            errno = get_errno()
+            raise OSError(errno, strerror(errno))
+        else:
+            self.fd: int = fd
+
+    def add(self, path: str) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, fsencode(path), _MASK)
+        if wd < 0:
+            errno = get_errno()
+            raise OSError(errno, strerror(errno), path)
+        else:
+            return wd
+
+    def rm(self, wd: int) -> None:
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+
+@dataclass
+class _Interest:
+    paths: AbstractSet[str]
+    on_change: Callable[[], None]
+    dirty: MutableSet[str] = field(default_factory=set)
+    lost: bool = False
+
+
+class Watcher:
+    """
+    Change notifications for files, via inotify on the parent dirs
+
+    Without inotify, or for dirs it can not watch, every path is always changed
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._inotify: Optional[_Inotify] = None
+        self._keys: MutableMapping[Hashable, _Interest] = {}
+        self._wds: MutableMapping[int, str] = {}
+        self._dirs: MutableMapping[str, int] = {}
+        self._unwatchable: MutableSet[str] = set()
+
+        if os is OS.linux:
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError, TypeError) as e:
+                log.warn("%s", e)
+            else:
+                Thread(daemon=True, target=self._read).start()
+
+    def _sync_dirs(self, inotify: _Inotify) -> None:
+        wanted = {dirname(path) for i in self._keys.values() for path in i.paths}
+
+        for dir in self._dirs.keys() - wanted:
+            wd = self._dirs.pop(dir)
+            self._wds.pop(wd, None)
+            inotify.rm(wd)
+
+        self._unwatchable &= wanted
+        for dir in wanted - self._dirs.keys() - self._unwatchable:
+            try:
+                wd = inotify.add(dir)
+            except OSError:
+                self._unwatchable.add(dir)
+            else:
+                self._dirs[dir] = wd
+                self._wds[wd] = dir
+
+    def watch(
+        self, key: Hashable, paths: AbstractSet[str], on_change: Callable[[], None]
+    ) -> Optional[AbstractSet[str]]:
+        """
+        Replaces what `key` is interested in
+
+        Returns which of `paths` could have changed since the last call,
+        `None` means all of them
+
+        `on_change` is called on the watcher thread, must not block
+        """
+
+        if not (inotify := self._inotify):
+            return None
+
+        with self._lock:
+            prev = self._keys.get(key)
+            self._keys[key] = _Interest(paths=paths, on_change=on_change)
+            self._sync_dirs(inotify)
+
+            if not prev or prev.lost:
+                return None
+            else:
+                return (
+                    (prev.dirty & paths)
+                    | (paths - prev.paths)
+                    | {path for path in paths if dirname(path) in self._unwatchable}
+                )
+
+    def _on_events(self, changed: AbstractSet[str], lost: bool) -> None:
+        notify: MutableSet[Callable[[], None]] = set()
+        with self._lock:
+            for interest in self._keys.values():
+                if lost:
+                    interest.lost = True
+                    notify.add(interest.on_change)
+                elif hits := changed & interest.paths:
+                    interest.dirty |= hits
+                    notify.add(interest.on_change)
+
+        for on_change in notify:
+            with suppress(Exception):
+                on_change()
+
+    def _read(self) -> None:
+        inotify = self._inotify
+        assert inotify
+        fd = inotify.fd
+        try:
+            while buf := read(fd, _BUF_SIZE):
+                changed: MutableSet[str] = set()
+                lost = False
+                offset = 0
+                while offset < len(buf):
+                    wd, mask, _, size = _EVENT.unpack_from(buf, offset)
+                    offset += _EVENT.size
+                    name = buf[offset : offset + size].rstrip(b"\0")
+                    offset += size
+
+                    if mask & _IN_Q_OVERFLOW:
+                        lost = True
+                        continue
+
+                    with self._lock:
+                        dir = self._wds.get(wd)
+                        if dir is not None and mask & _GONE:
+                            # Dropped, `_sync_dirs` adds it back if it comes back
+                            self._wds.pop(wd, None)
+                            self._dirs.pop(dir, None)
+                            if not mask & _IN_IGNORED:
+                                inotify.rm(wd)
+
+                    if dir is None:
+                        pass
+                    elif mask & _GONE:
+                        lost = True
+                    elif name:
+                        changed.add(normcase(join(dir, fsdecode(name))))
+
+                self._on_events(changed, lost=lost)
+        except OSError as e:
+            log.warn("%s", e)
+        finally:
+            self._inotify = None
+            with suppress(OSError):
+                close(fd)
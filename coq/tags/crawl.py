@@ -0,0 +1,45 @@
+from os.path import normcase
+from pathlib import PurePath
+from shutil import which
+from typing import AbstractSet
+
+from pynvim_pp.lib import decode
+from std2.asyncio.subprocess import call
+
+from ..shared.executor import very_nice
+
+
+async def crawl(cwd: PurePath) -> AbstractSet[str]:
+    """
+    Project files under `cwd`, less whatever `.gitignore` excludes
+
+    Outside of a git repo, nothing is crawled
+    """
+
+    if not (git := which("git")):
+        return set()
+    else:
+        prefix = await very_nice()
+        try:
+            proc = await call(
+                *prefix,
+                git,
+                "ls-files",
+                "-z",
+                "--cached",
+                "--others",
+                "--exclude-standard",
+                cwd=cwd,
+                check_returncode=set(),
+            )
+        except OSError:
+            return set()
+        else:
+            if proc.returncode:
+                return set()
+            else:
+                return {
+                    normcase(cwd / path)
+                    for path in decode(proc.stdout).split("\0")
+                    if path
+                }
@@ -1,15 +1,21 @@
+from asyncio import IncompleteReadError, LimitOverrunError, StreamReader
+from asyncio.subprocess import DEVNULL, PIPE, create_subprocess_exec
+from contextlib import suppress
 from json import loads
 from json.decoder import JSONDecodeError
 from pathlib import Path
-from typing import Iterator, Mapping, MutableMapping, MutableSequence, Tuple
+from typing import AsyncIterator, Iterator, Optional, Sequence
 
 from pynvim_pp.lib import decode
 from pynvim_pp.logging import log
-from std2.asyncio.subprocess import call
 from std2.string import removeprefix, removesuffix
 
 from ..shared.executor import very_nice
-from .types import Tag, Tags
+from .types import Tag
+
+_NL = b"\n"
+# Bytes of output handed to `parse` at a time
+_CHUNK = 2**20
 
 _FIELDS = "".join(
     f"{{{f}}}"
@@ -29,28 +35,87 @@ _FIELDS = "".join(
 )
 
 
-async def run(ctags: Path, *args: str) -> str:
-    if not args:
-        return ""
-    else:
-        prefix = await very_nice()
+async def _readline(stdout: StreamReader) -> bytes:
+    acc = bytearray()
+    while True:
         try:
-            proc = await call(
-                *prefix,
-                ctags,
-                "--sort=no",
-                "--output-format=json",
-                f"--fields={_FIELDS}",
-                *args,
-                check_returncode=set(),
-            )
-        except (FileNotFoundError, PermissionError):
-            return ""
+            b = await stdout.readuntil(_NL)
+        except LimitOverrunError as e:
+            c = await stdout.readexactly(e.consumed)
+            acc.extend(c)
+        except IncompleteReadError as e:
+            acc.extend(e.partial)
+            break
         else:
-            return decode(proc.stdout)
+            acc.extend(b)
+            break
+
+    return acc
+
+
+def _decode(line: bytes) -> Optional[Tag]:
+    try:
+        json = loads(decode(line))
+    except JSONDecodeError:
+        log.warning("%s", line)
+        return None
+    else:
+        return json if json.get("_type") == "tag" else None
+
+
+def parse(raw: bytes) -> Sequence[Tag]:
+    """
+    Decodes a chunk from `stream`, picklable for `Supervisor.offload`
+    """
+
+    return tuple(
+        tag for line in raw.splitlines() if line.strip() and (tag := _decode(line))
+    )
 
 
-def _unescape(pattern: str) -> str:
+async def stream(ctags: Path, *args: str) -> AsyncIterator[bytes]:
+    """
+    Whole lines of `ctags` output, about `_CHUNK` bytes at a time, see `parse`
+
+    Patterns are left escaped, see `unescape`
+    """
+
+    if not args:
+        return
+
+    prefix = await very_nice()
+    try:
+        proc = await create_subprocess_exec(
+            *prefix,
+            ctags,
+            "--sort=no",
+            "--output-format=json",
+            f"--fields={_FIELDS}",
+            *args,
+            stdin=DEVNULL,
+            stdout=PIPE,
+            stderr=DEVNULL,
+        )
+    except (FileNotFoundError, PermissionError):
+        return
+
+    assert proc.stdout
+    try:
+        acc = bytearray()
+        while line := await _readline(proc.stdout):
+            acc.extend(line)
+            if len(acc) >= _CHUNK:
+                yield bytes(acc)
+                acc.clear()
+        if acc:
+            yield bytes(acc)
+    finally:
+        with suppress(ProcessLookupError):
+            proc.kill()
+        await proc.wait()
+
+
+def unescape(pattern: str) -> str:
     def cont() -> Iterator[str]:
         stripped = removesuffix(removeprefix(pattern[1:-1], "^"), "$").strip()
         it = iter(stripped)
@@ -63,28 +128,3 @@ def _unescape(pattern: str) -> str:
                 yield c
 
     return "".join(cont())
-
-
-def parse(mtimes: Mapping[str, float], raw: str) -> Tags:
-    tags: MutableMapping[str, Tuple[str, float, MutableSequence[Tag]]] = {}
-
-    for line in raw.splitlines():
-        if line:
-            try:
-                json = loads(line)
-            except JSONDecodeError:
-                log.warning("%s", line)
-            else:
-                if json["_type"] == "tag":
-                    path = json["path"]
-                    if pattern := json.get("pattern"):
-                        new_pattern = _unescape(pattern)
-                    else:
-                        new_pattern = None
-                    json["pattern"] = new_pattern
-                    _, _, acc = tags.setdefault(
-                        path, (json["language"], mtimes.get(path, 0), [])
-                    )
-                    acc.append(json)
-
-    return tags
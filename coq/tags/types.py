@@ -1,4 +1,4 @@
-from typing import Mapping, Optional, Sequence, Tuple, TypedDict
+from typing import Optional, TypedDict
 
 
 class Tag(TypedDict):
@@ -17,6 +17,3 @@ class Tag(TypedDict):
     scopeKind: Optional[str]
 
     access: Optional[str]
-
-
-Tags = Mapping[str, Tuple[str, float, Sequence[Tag]]]
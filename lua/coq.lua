@@ -191,6 +191,7 @@ end
 require("coq.lsp-request")
 require("coq.ts-request")
 require("coq.completion")
+require("coq.context")
 
 return setmetatable(
   coq,
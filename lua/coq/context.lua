@@ -0,0 +1 @@
+../../coq/server/context.lua
\ No newline at end of file
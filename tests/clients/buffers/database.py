@@ -0,0 +1,189 @@
+from random import choice, randint
+from sqlite3 import Connection
+from string import ascii_lowercase
+from unittest import TestCase, skipUnless
+from uuid import uuid4
+
+from ....coq.clients.buffers.db.database import _VOCAB_GC, BDB
+from ....coq.consts import BENCH
+from ....coq.shared.parse import tokenize_lines
+from ....coq.shared.settings import EMPTY_MATCH, MatchOptions
+
+_OPTS = MatchOptions(
+    unifying_chars={"_"},
+    max_results=EMPTY_MATCH.max_results,
+    look_ahead=2,
+    exact_matches=2,
+    fuzzy_cutoff=0.6,
+)
+
+
+def _db() -> BDB:
+    return BDB(
+        1000,
+        unifying_chars=_OPTS.unifying_chars,
+        include_syms=False,
+        memory_index=False,
+    )
+
+
+def _words(db: BDB) -> dict:
+    words = db.words(_OPTS, None, word="abc", sym="", limitless=True, update=None)
+    return {word.text: word.line_num for word in words}
+
+
+class SetLines(TestCase):
+    def test_1(self) -> None:
+        db = _db()
+        db.set_lines(
+            1, filetype="", filename="", lo=0, hi=0, lines=["abcd", "abce"], tokens=None
+        )
+        self.assertEqual(_words(db), {"abcd": 1, "abce": 2})
+
+    def test_2(self) -> None:
+        db = _db()
+        db.set_lines(
+            1, filetype="", filename="", lo=0, hi=0, lines=["abcd", "abce"], tokens=None
+        )
+        db.set_lines(
+            1, filetype="", filename="", lo=0, hi=0, lines=["", "", ""], tokens=None
+        )
+        self.assertEqual(_words(db), {"abcd": 4, "abce": 5})
+
+        db.set_lines(1, filetype="", filename="", lo=1, hi=3, lines=[], tokens=None)
+        self.assertEqual(_words(db), {"abcd": 2, "abce": 3})
+
+    def test_3(self) -> None:
+        db = _db()
+        db.set_lines(
+            1, filetype="", filename="", lo=0, hi=0, lines=["abcd", "abce"], tokens=None
+        )
+        db.set_lines(
+            1, filetype="", filename="", lo=0, hi=2, lines=["abce", "x"], tokens=None
+        )
+        self.assertEqual(_words(db), {"abce": 1})
+
+    def test_4(self) -> None:
+        db = _db()
+        db.set_lines(
+            1, filetype="", filename="", lo=0, hi=0, lines=["", "abcd"], tokens=None
+        )
+        db.set_lines(
+            2, filetype="", filename="", lo=0, hi=0, lines=["abce"], tokens=None
+        )
+        db.vacuum({1: 1})
+        self.assertEqual(_words(db), {})
+
+    def test_5(self) -> None:
+        lines = ["abcd abce", "", "x_abcf"]
+        tokens = tokenize_lines(_OPTS.unifying_chars, include_syms=False, lines=lines)
+        for memory_index in (False, True):
+            db = BDB(
+                1000,
+                unifying_chars=_OPTS.unifying_chars,
+                include_syms=False,
+                memory_index=memory_index,
+            )
+            db.set_lines(
+                1, filetype="", filename="", lo=0, hi=0, lines=lines, tokens=tokens
+            )
+            self.assertEqual(_words(db), {"abcd": 1, "abce": 1})
+
+    def test_6(self) -> None:
+        lines = [f"abc{i}" for i in range(10)]
+        for memory_index in (False, True):
+            db = BDB(
+                4,
+                unifying_chars=_OPTS.unifying_chars,
+                include_syms=False,
+                memory_index=memory_index,
+            )
+            db.set_lines(
+                1, filetype="", filename="", lo=0, hi=0, lines=lines, tokens=None
+            )
+            self.assertEqual(len(_words(db)), 4)
+            for _ in range(20):
+                db.set_lines(
+                    1, filetype="", filename="", lo=0, hi=10, lines=lines, tokens=None
+                )
+            # Lines cut off by the limit are retried, not skipped for good
+            self.assertEqual(_words(db).keys(), {*lines})
+
+    def test_7(self) -> None:
+        db = _db()
+        for i in range(_VOCAB_GC * 3):
+            db.set_lines(
+                1, filetype="", filename="", lo=0, hi=1, lines=[f"x{i}"], tokens=None
+            )
+            db.vacuum({1: 1})
+        (vocab,) = db._conn.execute("SELECT COUNT(*) FROM vocab").fetchone()
+        # Words typed and then edited away do not pile up
+        self.assertLessEqual(vocab, _VOCAB_GC + 1)
+
+
+_V1_TABLES = """
+CREATE TABLE lines (
+  rowid     BLOB    NOT NULL PRIMARY KEY,
+  buffer_id INTEGER NOT NULL,
+  line_num  INTEGER NOT NULL,
+  line      TEXT    NOT NULL,
+  UNIQUE(buffer_id, line_num)
+) WITHOUT ROWID;
+CREATE INDEX lines_buffer_id ON lines (buffer_id);
+CREATE INDEX lines_line_num  ON lines (line_num);
+CREATE TABLE words (
+  line_id         BLOB    NOT NULL,
+  word            TEXT    NOT NULL,
+  lword           TEXT    NOT NULL,
+  UNIQUE(line_id, word)
+);
+CREATE INDEX words_line_id ON words (line_id);
+CREATE INDEX words_word    ON words (word);
+CREATE INDEX words_lword   ON words (lword);
+"""
+
+
+def _db_size(conn: Connection) -> int:
+    (page_count,) = conn.execute("PRAGMA page_count").fetchone()
+    (page_size,) = conn.execute("PRAGMA page_size").fetchone()
+    return page_count * page_size
+
+
+@skipUnless(BENCH, "COQ_BENCH")
+class MemoryBench(TestCase):
+    def test_1(self) -> None:
+        vocab = tuple(
+            "".join(choice(ascii_lowercase) for _ in range(randint(3, 12)))
+            for _ in range(5000)
+        )
+        bufs = tuple(
+            tuple(" ".join(choice(vocab) for _ in range(8)) for _ in range(2000))
+            for _ in range(40)
+        )
+
+        v1 = Connection(":memory:")
+        v1.executescript(_V1_TABLES)
+        for buf_id, lines in enumerate(bufs):
+            for line_num, line in enumerate(lines):
+                line_id = uuid4().bytes
+                v1.execute(
+                    "INSERT INTO lines VALUES (?, ?, ?, '')",
+                    (line_id, buf_id, line_num),
+                )
+                v1.executemany(
+                    "INSERT OR IGNORE INTO words VALUES (?, ?, LOWER(?))",
+                    ((line_id, word, word) for word in line.split()),
+                )
+
+        v2 = BDB(
+            10**9,
+            unifying_chars=_OPTS.unifying_chars,
+            include_syms=False,
+            memory_index=False,
+        )
+        for buf_id, lines in enumerate(bufs):
+            v2.set_lines(
+                buf_id, filetype="", filename="", lo=0, hi=0, lines=lines, tokens=None
+            )
+
+        self.assertLess(_db_size(v2._conn), _db_size(v1))
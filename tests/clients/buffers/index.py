@@ -0,0 +1,80 @@
+from unittest import TestCase
+
+from ....coq.clients.buffers.db.index import WordIndex
+from ....coq.shared.settings import EMPTY_MATCH, MatchOptions
+
+_OPTS = MatchOptions(
+    unifying_chars={"_"},
+    max_results=EMPTY_MATCH.max_results,
+    look_ahead=2,
+    exact_matches=2,
+    fuzzy_cutoff=0.6,
+)
+
+
+def _index() -> WordIndex:
+    return WordIndex(1000, unifying_chars=_OPTS.unifying_chars, include_syms=False)
+
+
+class Index(TestCase):
+    def test_1(self) -> None:
+        index = _index()
+        index.set_lines(
+            1, filetype="", filename="a", lo=0, hi=0, lines=["abcd abce"], tokens=None
+        )
+        words = {w.text for w in index.words(_OPTS, None, "abc", sym="", limit=9)}
+        self.assertEqual(words, {"abcd", "abce"})
+
+    def test_2(self) -> None:
+        index = _index()
+        index.set_lines(
+            1, filetype="", filename="a", lo=0, hi=0, lines=["abcd", "x"], tokens=None
+        )
+        index.set_lines(
+            1, filetype="", filename="a", lo=0, hi=1, lines=["zz"], tokens=None
+        )
+        words = [*index.words(_OPTS, None, "abc", sym="", limit=9)]
+        self.assertEqual(words, [])
+
+    def test_3(self) -> None:
+        index = _index()
+        index.set_lines(
+            1, filetype="", filename="a", lo=0, hi=0, lines=["", "abcd"], tokens=None
+        )
+        index.set_lines(
+            1, filetype="", filename="a", lo=0, hi=0, lines=["", ""], tokens=None
+        )
+        (word,) = index.words(_OPTS, None, "abc", sym="", limit=9)
+        self.assertEqual(word.line_num, 4)
+
+    def test_4(self) -> None:
+        index = _index()
+        index.set_lines(
+            1, filetype="c", filename="a", lo=0, hi=0, lines=["abcd"], tokens=None
+        )
+        index.set_lines(
+            2, filetype="py", filename="b", lo=0, hi=0, lines=["abce"], tokens=None
+        )
+        words = {w.text for w in index.words(_OPTS, "py", "abc", sym="", limit=9)}
+        self.assertEqual(words, {"abce"})
+
+        index.vacuum({1: 1})
+        words = {w.text for w in index.words(_OPTS, None, "abc", sym="", limit=9)}
+        self.assertEqual(words, {"abcd"})
+
+    def test_5(self) -> None:
+        index = _index()
+        index.set_lines(
+            1,
+            filetype="",
+            filename="a",
+            lo=0,
+            hi=0,
+            lines=["abcd", "abcd x"],
+            tokens=None,
+        )
+        index.set_lines(
+            1, filetype="", filename="a", lo=0, hi=1, lines=["zz"], tokens=None
+        )
+        (word,) = index.words(_OPTS, None, "abc", sym="", limit=9)
+        self.assertEqual(word.line_num, 2)
@@ -0,0 +1,45 @@
+from array import array
+from itertools import count
+from random import randint, seed
+from typing import MutableSequence
+from unittest import TestCase
+
+from ....coq.clients.buffers.db.positions import _BLOCK, Positions
+
+_IDS = count(1)
+
+
+def _splice(
+    positions: Positions, ids: MutableSequence[int], lo: int, hi: int, n: int
+) -> None:
+    new = array("q", (next(_IDS) for _ in range(n)))
+    positions.splice(ids, lo=lo, hi=hi, new=new)
+    ids[lo:hi] = new
+
+
+class Splice(TestCase):
+    def test_1(self) -> None:
+        positions, ids = Positions(), array("q")
+        _splice(positions, ids, lo=0, hi=0, n=_BLOCK * 5)
+        _splice(positions, ids, lo=3, hi=_BLOCK * 3, n=2)
+        for idx, line_id in enumerate(ids):
+            self.assertEqual(positions.get(ids, line_id=line_id), idx)
+
+    def test_2(self) -> None:
+        seed(0)
+        positions, ids = Positions(), array("q")
+        gone: MutableSequence[int] = []
+        for _ in range(300):
+            lo = randint(0, len(ids))
+            hi = randint(lo, min(len(ids), lo + randint(0, _BLOCK * 2)))
+            gone.extend(ids[lo:hi])
+            _splice(positions, ids, lo=lo, hi=hi, n=randint(0, _BLOCK * 2))
+            for _ in range(8):
+                if ids:
+                    idx = randint(0, len(ids) - 1)
+                    self.assertEqual(positions.get(ids, line_id=ids[idx]), idx)
+
+        for idx, line_id in enumerate(ids):
+            self.assertEqual(positions.get(ids, line_id=line_id), idx)
+        for line_id in gone:
+            self.assertIsNone(positions.get(ids, line_id=line_id))
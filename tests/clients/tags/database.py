@@ -0,0 +1,108 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Sequence
+from unittest import TestCase
+
+from ....coq.clients.tags.db.database import CTDB
+from ....coq.shared.settings import EMPTY_MATCH, MatchOptions
+from ....coq.tags.types import Tag
+
+_OPTS = MatchOptions(
+    unifying_chars={"_"},
+    max_results=EMPTY_MATCH.max_results,
+    look_ahead=2,
+    exact_matches=2,
+    fuzzy_cutoff=0.6,
+)
+
+
+def _tag(path: str, line: int, name: str) -> Tag:
+    return Tag(
+        language="Python",
+        path=path,
+        line=line,
+        kind="function",
+        name=name,
+        pattern=None,
+        typeref=None,
+        scope=None,
+        scopeKind=None,
+        access=None,
+    )
+
+
+def _index(db: CTDB, tags: Sequence[Tag]) -> None:
+    db.reconciliate(set(), new={tag["path"]: 1 for tag in tags}, tags=tags)
+
+
+def _select(db: CTDB, filename: str, line_num: int) -> Sequence[Tag]:
+    return tuple(
+        db.select(
+            _OPTS,
+            filename=filename,
+            line_num=line_num,
+            word="abc",
+            sym="",
+            limitless=True,
+        )
+    )
+
+
+class Names(TestCase):
+    def setUp(self) -> None:
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db = CTDB(Path(tmp.name), cwd=Path(tmp.name))
+
+    def test_1(self) -> None:
+        _index(
+            self.db,
+            (
+                _tag("a", line=1, name="abcd"),
+                _tag("b", line=1, name="abcd"),
+                _tag("b", line=2, name="abce"),
+            ),
+        )
+        tags = _select(self.db, filename="a", line_num=1)
+        self.assertEqual(sorted(tag["name"] for tag in tags), ["abcd", "abce"])
+
+    def test_2(self) -> None:
+        _index(
+            self.db,
+            (
+                _tag("a", line=1, name="abcd"),
+                _tag("a", line=9, name="abce"),
+                _tag("b", line=5, name="abce"),
+                _tag("b", line=6, name="abcf"),
+            ),
+        )
+        tags = _select(self.db, filename="a", line_num=8)
+        self.assertEqual(
+            [(tag["path"], tag["name"]) for tag in tags][:2],
+            [("a", "abce"), ("a", "abcd")],
+        )
+
+    def test_3(self) -> None:
+        _index(
+            self.db,
+            (
+                _tag("a", line=1, name="abcd"),
+                _tag("b", line=1, name="abcd"),
+            ),
+        )
+        self.db.reconciliate({"a"}, new={}, tags=())
+        tags = _select(self.db, filename="b", line_num=1)
+        self.assertEqual([(tag["path"], tag["name"]) for tag in tags], [("b", "abcd")])
+
+        self.db.reconciliate({"b"}, new={}, tags=())
+        _index(self.db, (_tag("c", line=1, name="xyz"),))
+        self.assertEqual(_select(self.db, filename="c", line_num=1), ())
+
+    def test_4(self) -> None:
+        _index(self.db, (_tag("a", line=1, name="abcd"),))
+        self.db.reconciliate(
+            set(), new={"a": 2}, tags=(_tag("a", line=2, name="abce"),)
+        )
+        tags = _select(self.db, filename="a", line_num=1)
+        self.assertEqual([(tag["name"], tag["line"]) for tag in tags], [("abce", 2)])
+        self.assertEqual(self.db.paths(), {"a": 2})
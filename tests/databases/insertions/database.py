@@ -0,0 +1,70 @@
+from atexit import unregister
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+from uuid import uuid4
+
+from ....coq.databases.insertions import database
+from ....coq.databases.insertions.database import _RECENCY, IDB
+
+_SQL = database.sql
+
+
+def _broken(*path: str) -> str:
+    return "INVALID" if path == ("insert", "inserted") else _SQL(*path)
+
+
+def _idb(case: TestCase) -> IDB:
+    db = IDB()
+    case.addCleanup(unregister, db.flush)
+    return db
+
+
+def _count(db: IDB, table: str) -> int:
+    (count,) = db._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+    return count
+
+
+class Recency(IsolatedAsyncioTestCase):
+    async def test_1(self) -> None:
+        db = _idb(self)
+        for sort_by in ("a", "b", "a"):
+            db.inserted(uuid4().bytes, sort_by=sort_by)
+        order = db.insertion_order(n_rows=9)
+        self.assertEqual(order.keys(), {"a", "b"})
+        self.assertGreater(order["a"], order["b"])
+
+    async def test_2(self) -> None:
+        db = _idb(self)
+        for idx in range(_RECENCY * 2):
+            db.inserted(uuid4().bytes, sort_by=str(idx))
+        self.assertEqual(len(db.insertion_order(n_rows=_RECENCY * 2)), _RECENCY)
+        order = db.insertion_order(n_rows=2)
+        self.assertEqual(order.keys(), {str(_RECENCY * 2 - 1), str(_RECENCY * 2 - 2)})
+
+
+class Flush(IsolatedAsyncioTestCase):
+    def _fill(self, db: IDB) -> None:
+        batch, instance = uuid4().bytes, uuid4().bytes
+        db.new_source("x")
+        db.new_batch(batch)
+        db.new_instance(instance, source="x", batch_id=batch)
+        db.new_stat(instance, interrupted=False, duration=1, items=1)
+        db.inserted(instance, sort_by="a")
+
+    async def test_1(self) -> None:
+        db = _idb(self)
+        self._fill(db)
+        self.assertEqual(_count(db, "inserted"), 0)
+        db.flush()
+        self.assertEqual(_count(db, "inserted"), 1)
+        self.assertEqual(_count(db, "instance_stats"), 1)
+
+    async def test_2(self) -> None:
+        db = _idb(self)
+        self._fill(db)
+        with patch.object(database, "sql", _broken):
+            db.flush()
+        self.assertEqual(_count(db, "instances"), 0)
+        db.flush()
+        self.assertEqual(_count(db, "instances"), 1)
+        self.assertEqual(_count(db, "inserted"), 1)
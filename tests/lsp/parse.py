@@ -0,0 +1,153 @@
+from dataclasses import replace
+from random import choice, randint
+from string import ascii_letters
+from time import monotonic
+from typing import Any, Callable, Mapping, Optional, Sequence
+from unittest import TestCase, skipUnless
+from uuid import uuid4
+
+from ...coq.consts import BENCH
+from ...coq.lsp.parse import _fast_item, _generic_item
+from ...coq.lsp.protocol import LSProtocol
+from ...coq.shared.types import UTF16, Completion, Doc, ExternLSP, LazyDoc
+
+_PROTOCOL = LSProtocol(
+    CompletionItemKind={1: "Text", 2: "Method", 3: "Function", 10: "Property"},
+    InsertTextFormat={1: "PlainText", 2: "Snippet"},
+)
+_CURSORS = (3, 10, 10, 10)
+
+
+def _word() -> str:
+    return "".join(choice(ascii_letters) for _ in range(randint(3, 12)))
+
+
+def _range(row: int, lo: int, hi: int) -> Mapping[str, Any]:
+    return {
+        "start": {"line": row, "character": lo},
+        "end": {"line": row, "character": hi},
+    }
+
+
+def _rust_analyzer() -> Mapping[str, Any]:
+    word = _word()
+    item = {
+        "label": word,
+        "kind": choice((2, 3, 10)),
+        "detail": f"fn {word}(&self) -> usize",
+        "documentation": {"kind": "markdown", "value": f"Returns the `{word}`"},
+        "filterText": word,
+        "sortText": "ffffffef",
+        "insertTextFormat": 2,
+        "textEdit": {"range": _range(3, 8, 10), "newText": f"{word}($0)"},
+        "labelDetails": {"detail": "(…)", "description": "usize"},
+        "data": {"position": {"line": 3, "character": 10}, "imports": []},
+    }
+    if not randint(0, 4):
+        item["additionalTextEdits"] = [
+            {"range": _range(0, 0, 0), "newText": f"use crate::{word};\n"}
+        ]
+    return item
+
+
+def _tsserver() -> Mapping[str, Any]:
+    word = _word()
+    item: Any = {
+        "label": word,
+        "kind": choice((2, 10)),
+        "sortText": "11",
+        "data": {"file": "/main.ts", "line": 4, "offset": 11, "entryNames": [word]},
+    }
+    if not randint(0, 2):
+        item["textEdit"] = {
+            "insert": _range(3, 8, 10),
+            "replace": _range(3, 8, 12),
+            "newText": word,
+        }
+    elif not randint(0, 2):
+        item["insertText"] = f"{word}()"
+        item["command"] = {"title": "", "command": "editor.action.triggerSuggest"}
+    return item
+
+
+def _parse(p: Callable[..., Optional[Completion]], item: Any) -> Optional[Completion]:
+    return p(
+        _PROTOCOL,
+        extern_type=ExternLSP,
+        on_top=False,
+        client="",
+        encoding=UTF16,
+        cursors=_CURSORS,
+        short_name="",
+        weight_adjust=0,
+        item=item,
+    )
+
+
+_UID = uuid4()
+
+
+def _normalized(comp: Optional[Completion]) -> Optional[Completion]:
+    if not comp:
+        return None
+    else:
+        doc = comp.doc.thunk() if isinstance(comp.doc, LazyDoc) else comp.doc
+        return replace(
+            comp, uid=_UID, secondary_edits=tuple(comp.secondary_edits), doc=doc
+        )
+
+
+class FastItem(TestCase):
+    def test_1(self) -> None:
+        for gen in (_rust_analyzer, _tsserver):
+            for _ in range(200):
+                item = gen()
+                fast = _normalized(_parse(_fast_item, item=item))
+                self.assertIsNotNone(fast)
+                self.assertEqual(fast, _normalized(_parse(_generic_item, item=item)))
+
+    def test_2(self) -> None:
+        for item in (
+            {"label": 1},
+            {"label": "a", "textEdit": {"newText": "a"}},
+            {"label": "a", "documentation": {"kind": "markdown"}},
+        ):
+            self.assertIsNone(_parse(_fast_item, item=item))
+
+    def test_3(self) -> None:
+        item = _rust_analyzer()
+        item["additionalTextEdits"] = [{"range": _range(0, 0, 0), "newText": "a"}]
+        comp = _parse(_fast_item, item=item)
+        assert comp
+        self.assertEqual(len(comp.secondary_edits), 1)
+        (edit,) = comp.secondary_edits
+        self.assertEqual(edit.new_text, "a")
+
+    def test_4(self) -> None:
+        item = _rust_analyzer()
+        item["additionalTextEdits"] = [{"newText": "a"}]
+        self.assertIsNone(_parse(_fast_item, item=item))
+        self.assertIsNone(_parse(_generic_item, item=item))
+
+    def test_5(self) -> None:
+        item = {"label": "a", "detail": "b"}
+        comp = _parse(_fast_item, item=item)
+        assert comp and isinstance(comp.doc, LazyDoc)
+        self.assertEqual(comp.doc.thunk(), Doc(text="b", syntax=""))
+        comp = _parse(_fast_item, item={"label": "a"})
+        assert comp
+        self.assertIsNone(comp.doc)
+
+
+@skipUnless(BENCH, "COQ_BENCH")
+class ParseBench(TestCase):
+    def test_1(self) -> None:
+        for gen in (_rust_analyzer, _tsserver):
+            items: Sequence[Any] = tuple(gen() for _ in range(20_000))
+            elapsed = {}
+            for p in (_generic_item, _fast_item):
+                t1 = monotonic()
+                for item in items:
+                    _parse(p, item=item)
+                elapsed[p] = monotonic() - t1
+            self.assertLess(elapsed[_fast_item], elapsed[_generic_item], gen.__name__)
@@ -0,0 +1,44 @@
+from collections import Counter
+from random import choice, randint
+from typing import MutableSequence, Sequence
+from unittest import TestCase
+
+from ...coq.server.proximity import ProximityIndex
+from ...coq.shared.parse import coalesce
+from ...coq.shared.types import ChangeEvent
+
+_UNIFYING_CHARS = frozenset(("_", "-"))
+
+
+def _rand_line() -> str:
+    return " ".join(choice(("a", "b", "c_d", "e.f", "g")) for _ in range(randint(0, 4)))
+
+
+def _ref(lines: Sequence[str]) -> Counter:
+    return Counter(
+        word
+        for line in lines
+        for word in coalesce(
+            _UNIFYING_CHARS, include_syms=True, backwards=False, chars=line
+        )
+    )
+
+
+class Proximity(TestCase):
+    def test_1(self) -> None:
+        index = ProximityIndex(_UNIFYING_CHARS)
+        buf: MutableSequence[str] = [_rand_line() for _ in range(50)]
+        for _ in range(2000):
+            change = None
+            if randint(0, 1):
+                lo = randint(0, len(buf))
+                hi = randint(lo, min(len(buf), lo + 3))
+                lines = [_rand_line() for _ in range(randint(0, 3))]
+                buf[lo:hi] = lines
+                change = ChangeEvent(range=range(lo, hi), lines=lines)
+
+            lo = randint(0, len(buf))
+            hi = randint(lo, min(len(buf), lo + 10))
+            window = buf[lo:hi]
+            proximity = index.update(0, lo=lo, lines=window, change=change)
+            self.assertEqual(proximity, _ref(window))
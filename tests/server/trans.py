@@ -0,0 +1,122 @@
+from dataclasses import asdict
+from locale import strxfrm
+from random import choice, randint, uniform
+from string import ascii_letters
+from time import monotonic
+from typing import Any, Callable, Iterable, Sequence
+from unittest import TestCase, skipUnless
+from uuid import uuid4
+
+from ...coq.consts import BENCH
+from ...coq.server.trans import _rank
+from ...coq.shared.runtime import Metric
+from ...coq.shared.settings import Weights
+from ...coq.shared.types import Completion, Edit
+
+_ADJUSTMENT = Weights(prefix_matches=2, edit_distance=1.5, recency=1, proximity=0.5)
+
+
+def _metric() -> Metric:
+    sort_by = "".join(choice(ascii_letters[:8]) for _ in range(randint(1, 4)))
+    comp = Completion(
+        source="",
+        always_on_top=not randint(0, 50),
+        weight_adjust=0,
+        label=sort_by,
+        sort_by=sort_by,
+        primary_edit=Edit(new_text=sort_by),
+        adjust_indent=False,
+        icon_match=None,
+        preselect=not randint(0, 50),
+        kind=choice(("", "Function")),
+    )
+    weight = Weights(
+        prefix_matches=randint(0, 4),
+        edit_distance=round(uniform(0, 1), 2),
+        recency=choice((0, randint(0, 100))),
+        proximity=randint(0, 3),
+    )
+    return Metric(
+        instance=uuid4(),
+        comp=comp,
+        weight_adjust=1,
+        weight=weight,
+        label_width=len(sort_by),
+        kind_width=0,
+    )
+
+
+def _ref_cum(adjustment: Weights, metrics: Iterable[Metric]) -> Weights:
+    acc = asdict(Weights(prefix_matches=0, edit_distance=0, recency=0, proximity=0))
+    for metric in metrics:
+        for key, val in asdict(metric.weight).items():
+            acc[key] += val
+    for key, val in asdict(adjustment).items():
+        if val:
+            acc[key] /= val
+        else:
+            acc[key] = 0
+    return Weights(**acc)
+
+
+def _ref_sort_by(is_lower: bool, adjustment: Weights) -> Callable[[Metric], Any]:
+    adjust = asdict(adjustment)
+
+    def key_by(metric: Metric) -> Any:
+        tot = sum(
+            val / adjust[key] if adjust[key] else 0
+            for key, val in asdict(metric.weight).items()
+        )
+        return (
+            -(metric.comp.always_on_top),
+            -(metric.comp.preselect),
+            -round(tot * metric.weight_adjust * 10000),
+            -len(metric.comp.secondary_edits),
+            -(metric.comp.kind != ""),
+            -(metric.comp.doc is not None),
+            -metric.comp.sort_by[:1].isalnum(),
+            strxfrm(
+                metric.comp.sort_by.swapcase() if is_lower else metric.comp.sort_by
+            ),
+        )
+
+    return key_by
+
+
+def _ref_rank(is_lower: bool, metrics: Sequence[Metric]) -> Sequence[Metric]:
+    adjustment = _ref_cum(_ADJUSTMENT, metrics=metrics)
+    return sorted(metrics, key=_ref_sort_by(is_lower, adjustment=adjustment))
+
+
+class Rank(TestCase):
+    def test_1(self) -> None:
+        self.assertEqual(
+            tuple(_rank(_ADJUSTMENT, is_lower=False, lazy=True, metrics=())), ()
+        )
+
+    def test_2(self) -> None:
+        for _ in range(200):
+            metrics = tuple(_metric() for _ in range(randint(1, 200)))
+            is_lower = bool(randint(0, 1))
+            expected = [m.comp.sort_by for m in _ref_rank(is_lower, metrics=metrics)]
+            for lazy in (True, False):
+                ranked = _rank(
+                    _ADJUSTMENT, is_lower=is_lower, lazy=lazy, metrics=metrics
+                )
+                self.assertEqual([m.comp.sort_by for m in ranked], expected)
+
+
+@skipUnless(BENCH, "COQ_BENCH")
+class RankBench(TestCase):
+    def test_1(self) -> None:
+        metrics = tuple(_metric() for _ in range(10_000))
+
+        t1 = monotonic()
+        _ref_rank(False, metrics=metrics)
+        t2 = monotonic()
+        ranked = _rank(_ADJUSTMENT, is_lower=False, lazy=True, metrics=metrics)
+        for _, _ in zip(range(100), ranked):
+            pass
+        t3 = monotonic()
+
+        self.assertLess(t3 - t2, t2 - t1)
@@ -0,0 +1,55 @@
+from unittest import TestCase
+from uuid import uuid4
+
+from ...coq.shared.deadlines import _EXPLORE, _MIN_SAMPLES, _WINDOW, Deadlines
+
+
+class Budget(TestCase):
+    def test_1(self) -> None:
+        deadlines = Deadlines()
+        for _ in range(_MIN_SAMPLES - 1):
+            deadlines.record("x", instance=uuid4(), elapsed=0.01)
+        self.assertEqual(deadlines.budget("x", lo=0, hi=1), 1)
+
+    def test_2(self) -> None:
+        deadlines = Deadlines()
+        for _ in range(_MIN_SAMPLES):
+            instance = uuid4()
+            deadlines.record("x", instance=instance, elapsed=0.01)
+            deadlines.inserted(instance)
+        budget = deadlines.budget("x", lo=0, hi=1)
+        self.assertTrue(0.01 <= budget < 1)
+
+    def test_3(self) -> None:
+        deadlines = Deadlines()
+        for _ in range(_MIN_SAMPLES):
+            deadlines.record("x", instance=uuid4(), elapsed=0.5)
+        self.assertEqual(deadlines.budget("x", lo=0.1, hi=1), 0.1)
+
+    def test_4(self) -> None:
+        deadlines = Deadlines()
+        for _ in range(_MIN_SAMPLES):
+            instance = uuid4()
+            deadlines.record("x", instance=instance, elapsed=0.5)
+            deadlines.inserted(instance)
+        budget = deadlines.budget("x", lo=0, hi=1)
+        for _ in range(_MIN_SAMPLES * 10):
+            instance = uuid4()
+            deadlines.record("x", instance=instance, elapsed=None)
+            deadlines.inserted(instance)
+        self.assertEqual(deadlines.budget("x", lo=0, hi=1), budget)
+
+    def test_5(self) -> None:
+        deadlines = Deadlines()
+        for _ in range(_MIN_SAMPLES):
+            deadlines.record("x", instance=uuid4(), elapsed=0.5)
+        budgets = [deadlines.budget("x", lo=0.1, hi=1) for _ in range(_EXPLORE)]
+        self.assertEqual(min(budgets), 0.1)
+        self.assertEqual(max(budgets), 1)
+
+        for _ in range(_WINDOW):
+            instance = uuid4()
+            deadlines.record("x", instance=instance, elapsed=0.5)
+            deadlines.inserted(instance)
+        budget = deadlines.budget("x", lo=0.1, hi=1)
+        self.assertTrue(0.5 <= budget < 1)
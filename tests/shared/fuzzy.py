@@ -1,6 +1,17 @@
+from random import choice, randint
 from unittest import TestCase
 
-from ...coq.shared.fuzzy import dl_distance, metrics, multi_set_ratio, quick_ratio
+from ...coq.shared.fuzzy import (
+    MatchMetrics,
+    _p_matches,
+    bp_distance,
+    char_masks,
+    dl_distance,
+    metrics,
+    multi_set_ratio,
+    quick_ratio,
+    score_batch,
+)
 
 _LOOK_AHEAD = 2
 
@@ -36,6 +47,12 @@ class MultiSetRatio(TestCase):
         ratio = multi_set_ratio(lhs, rhs, look_ahead=_LOOK_AHEAD)
         self.assertAlmostEqual(ratio, 2 / 3)
 
+    def test_6(self) -> None:
+        lhs = "aab"
+        for _ in range(2):
+            ratio = multi_set_ratio(lhs, "aaa", look_ahead=_LOOK_AHEAD)
+            self.assertAlmostEqual(ratio, 2 / 3)
+
 
 class QuickRatio(TestCase):
     def test_1(self) -> None:
@@ -167,3 +184,63 @@ class Metrics(TestCase):
         m = metrics(cword, match, look_ahead=_LOOK_AHEAD)
         self.assertEqual(m.prefix_matches, 0)
         self.assertAlmostEqual(m.edit_distance, 0)
+
+
+def _rand_str(alphabet: str, hi: int) -> str:
+    return "".join(choice(alphabet) for _ in range(randint(0, hi)))
+
+
+def _ref_metrics(lhs: str, rhs: str, look_ahead: int) -> MatchMetrics:
+    shorter = min(len(lhs), len(rhs))
+    if not shorter:
+        return MatchMetrics(prefix_matches=0, edit_distance=0)
+    else:
+        p_matches = _p_matches(lhs, rhs)
+        cutoff = min(max(len(lhs), len(rhs)), shorter + look_ahead)
+        more = cutoff - shorter
+        l, r = lhs[p_matches:cutoff], rhs[p_matches:cutoff]
+
+        dist = dl_distance(l, r)
+        edit_dist = 1 - (dist - more) / shorter
+        return MatchMetrics(prefix_matches=p_matches, edit_distance=edit_dist)
+
+
+class BPDistance(TestCase):
+    def test_1(self) -> None:
+        for _ in range(5000):
+            lhs = _rand_str("abcd", hi=9)
+            rhs = _rand_str("abcd", hi=9)
+            offset = randint(0, len(lhs))
+            masks = char_masks(lhs)
+            l = lhs[offset:]
+            d1 = bp_distance(masks, offset=offset, lhs=l, rhs=rhs)
+            d2 = dl_distance(l, rhs)
+            self.assertEqual(d1, d2, (lhs, offset, rhs))
+
+    def test_2(self) -> None:
+        for _ in range(5000):
+            cword = _rand_str("abc_", hi=8)
+            match = _rand_str("abc_", hi=16)
+            for look_ahead in range(0, 4):
+                lhs = metrics(cword, match, look_ahead=look_ahead)
+                rhs = _ref_metrics(cword, match, look_ahead=look_ahead)
+                self.assertEqual(lhs, rhs, (cword, match, look_ahead))
+
+
+class ScoreBatch(TestCase):
+    def test_1(self) -> None:
+        scored = score_batch("", candidates=(), look_ahead=_LOOK_AHEAD)
+        self.assertEqual(len(scored.prefix_matches), 0)
+        self.assertEqual(len(scored.edit_distances), 0)
+
+    def test_2(self) -> None:
+        for _ in range(500):
+            cword = _rand_str("abc_", hi=8)
+            matches = tuple(_rand_str("abc_", hi=16) for _ in range(20))
+            scored = score_batch(cword, candidates=matches, look_ahead=_LOOK_AHEAD)
+            for match, p_matches, e_dist in zip(
+                matches, scored.prefix_matches, scored.edit_distances
+            ):
+                m = metrics(cword, match, look_ahead=_LOOK_AHEAD)
+                self.assertEqual(p_matches, m.prefix_matches)
+                self.assertAlmostEqual(e_dist, m.edit_distance)
@@ -0,0 +1,33 @@
+from unittest import TestCase
+
+from ...coq.shared.lines import BufLines
+
+
+class Mirror(TestCase):
+    def test_1(self) -> None:
+        lines = BufLines()
+        lines.update(1, tick=1, lo=0, hi=0, lines=["a"])
+        self.assertIsNone(lines.get(1, tick=None, line_count=1, lo=0, hi=1))
+
+    def test_2(self) -> None:
+        lines = BufLines()
+        lines.update(1, tick=1, lo=0, hi=-1, lines=["a", "b", "c"])
+        lines.update(1, tick=2, lo=1, hi=2, lines=["x", "y"])
+        self.assertEqual(
+            lines.get(1, tick=2, line_count=4, lo=0, hi=4), ("a", "x", "y", "c")
+        )
+
+        lines.update(1, tick=3, lo=0, hi=2, lines=[])
+        self.assertEqual(lines.get(1, tick=3, line_count=2, lo=0, hi=2), ("y", "c"))
+
+    def test_3(self) -> None:
+        lines = BufLines()
+        lines.update(1, tick=1, lo=0, hi=-1, lines=["a", "b"])
+        self.assertIsNone(lines.get(1, tick=2, line_count=2, lo=0, hi=2))
+        self.assertIsNone(lines.get(1, tick=None, line_count=3, lo=0, hi=2))
+
+        lines.changedtick(1, tick=2)
+        self.assertEqual(lines.get(1, tick=2, line_count=2, lo=0, hi=2), ("a", "b"))
+
+        lines.detach(1)
+        self.assertIsNone(lines.get(1, tick=None, line_count=2, lo=0, hi=2))
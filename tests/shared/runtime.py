@@ -0,0 +1,106 @@
+from dataclasses import replace
+from unittest import TestCase
+
+from ...coq.shared.context import EMPTY_CONTEXT
+from ...coq.shared.runtime import _complete, _extends, refilter
+from ...coq.shared.settings import MatchOptions
+from ...coq.shared.types import Completion, Context, Edit
+
+_MATCH = MatchOptions(
+    unifying_chars={"_"},
+    max_results=3,
+    look_ahead=2,
+    exact_matches=2,
+    fuzzy_cutoff=0.6,
+)
+
+
+def _ctx(line_before: str, word: str) -> Context:
+    return replace(
+        EMPTY_CONTEXT,
+        manual=False,
+        position=(0, len(line_before)),
+        line_before=line_before,
+        words=word,
+        words_before=word,
+    )
+
+
+def _comp(sort_by: str) -> Completion:
+    return Completion(
+        source="",
+        always_on_top=False,
+        weight_adjust=0,
+        label=sort_by,
+        sort_by=sort_by,
+        primary_edit=Edit(new_text=sort_by),
+        adjust_indent=False,
+        icon_match=None,
+    )
+
+
+class Extends(TestCase):
+    def test_1(self) -> None:
+        prev, cur = _ctx("x ab", word="ab"), _ctx("x abc", word="abc")
+        self.assertTrue(_extends(prev, cur=cur))
+
+    def test_2(self) -> None:
+        prev, cur = _ctx("x ab", word="ab"), _ctx("x ab.", word="")
+        self.assertFalse(_extends(prev, cur=cur))
+
+    def test_3(self) -> None:
+        prev, cur = _ctx("x ", word=""), _ctx("x a", word="a")
+        self.assertFalse(_extends(prev, cur=cur))
+
+    def test_4(self) -> None:
+        prev, cur = _ctx("x ab", word="ab"), _ctx("x abc", word="abc")
+        self.assertFalse(_extends(prev, cur=replace(cur, manual=True)))
+
+
+class Refilter(TestCase):
+    def test_1(self) -> None:
+        ctx = _ctx("abc", word="abc")
+        kept = [
+            comp.sort_by
+            for comp in map(_comp, ("abcdef", "abxyz", "zzz", "ab"))
+            if refilter(
+                _MATCH, context=ctx, completion=comp, syms=True, drop_prefixes=True
+            )
+        ]
+        self.assertEqual(kept, ["abcdef", "abxyz"])
+
+    def test_2(self) -> None:
+        ctx = _ctx("ab", word="ab")
+        comps = tuple(map(_comp, ("abc", "abd")))
+        self.assertTrue(_complete(_MATCH, context=ctx, completions=comps))
+        comps = tuple(map(_comp, ("abc", "abd", "abe")))
+        self.assertFalse(_complete(_MATCH, context=ctx, completions=comps))
+
+    def test_3(self) -> None:
+        ctx = _ctx("for", word="for")
+        comp = _comp("for")
+        self.assertFalse(
+            refilter(
+                _MATCH, context=ctx, completion=comp, syms=True, drop_prefixes=True
+            )
+        )
+        # Snippets keep exact triggers, "fo" -> "for" must not lose "for"
+        self.assertTrue(
+            refilter(
+                _MATCH, context=ctx, completion=comp, syms=True, drop_prefixes=False
+            )
+        )
+
+    def test_4(self) -> None:
+        ctx = replace(_ctx("x.ab", word=""), syms="x.ab", syms_before="x.ab")
+        comp = _comp("x.abc")
+        self.assertTrue(
+            refilter(
+                _MATCH, context=ctx, completion=comp, syms=True, drop_prefixes=True
+            )
+        )
+        self.assertFalse(
+            refilter(
+                _MATCH, context=ctx, completion=comp, syms=False, drop_prefixes=True
+            )
+        )
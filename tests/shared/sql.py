@@ -0,0 +1,79 @@
+from collections import Counter
+from random import choice, randint
+from sqlite3 import connect
+from string import ascii_lowercase
+from time import monotonic
+from unittest import TestCase, skipUnless
+
+from ...coq.consts import BENCH
+from ...coq.shared.fuzzy import _p_matches, quick_ratio
+
+_LOOK_AHEAD = 2
+_BENCH_ROWS = 200_000
+
+
+def _rand_str(alphabet: str, lo: int, hi: int) -> str:
+    return "".join(choice(alphabet) for _ in range(randint(lo, hi)))
+
+
+def _ref_multi_set_ratio(lhs: str, rhs: str, look_ahead: int) -> float:
+    shorter = min(len(lhs), len(rhs))
+    if not shorter:
+        return 1
+    else:
+        cutoff = shorter + look_ahead
+        l, r = lhs[:cutoff], rhs[:cutoff]
+        longer = max(len(l), len(r))
+
+        l_c, r_c = Counter(l), Counter(r)
+        dif = l_c - r_c if len(l) > len(r) else r_c - l_c
+
+        ratio = 1 - sum(dif.values()) / longer
+        adjust = shorter / longer
+        return ratio / adjust
+
+
+def _ref_quick_ratio(lhs: str, rhs: str, look_ahead: int) -> float:
+    shorter = min(len(lhs), len(rhs))
+    if not shorter:
+        return 1
+    else:
+        p_matches = _p_matches(lhs, rhs)
+        l, r = lhs[p_matches:], rhs[p_matches:]
+
+        l_ratio = p_matches / shorter
+        r_ratio = _ref_multi_set_ratio(l, r, look_ahead=look_ahead) * (1 - l_ratio)
+        return l_ratio + r_ratio * 0.5
+
+
+class Similarity(TestCase):
+    def test_1(self) -> None:
+        for _ in range(5000):
+            lhs = _rand_str("abcd_", lo=0, hi=8)
+            rhs = _rand_str("abcd_", lo=0, hi=16)
+            for look_ahead in range(0, 4):
+                r1 = quick_ratio(lhs, rhs, look_ahead=look_ahead)
+                r2 = _ref_quick_ratio(lhs, rhs, look_ahead=look_ahead)
+                self.assertAlmostEqual(r1, r2, msg=(lhs, rhs, look_ahead))
+
+
+@skipUnless(BENCH, "COQ_BENCH")
+class SimilarityBench(TestCase):
+    def test_1(self) -> None:
+        conn = connect(":memory:")
+        conn.create_function("X_REF", 3, func=_ref_quick_ratio, deterministic=True)
+        conn.create_function("X_SIMILARITY", 3, func=quick_ratio, deterministic=True)
+        conn.execute("CREATE TABLE words (lword TEXT NOT NULL)")
+        conn.executemany(
+            "INSERT INTO words (lword) VALUES (?)",
+            ((_rand_str(ascii_lowercase, lo=2, hi=16),) for _ in range(_BENCH_ROWS)),
+        )
+
+        for word in ("ab", "abcdef", "abcdefghijkl"):
+            elapsed = {}
+            for func in ("X_REF", "X_SIMILARITY"):
+                sql = f"SELECT COUNT(*) FROM words WHERE {func}(?, lword, ?) > 0.5"
+                t1 = monotonic()
+                conn.execute(sql, (word, _LOOK_AHEAD)).fetchall()
+                elapsed[func] = monotonic() - t1
+            self.assertLess(elapsed["X_SIMILARITY"], elapsed["X_REF"], msg=word)
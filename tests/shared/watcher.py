@@ -0,0 +1,40 @@
+from os.path import join, normcase
+from tempfile import TemporaryDirectory
+from threading import Event
+from unittest import TestCase, skipUnless
+
+from std2.platform import OS, os
+
+from ...coq.shared.watcher import Watcher
+
+
+@skipUnless(os is OS.linux, "inotify")
+class Watch(TestCase):
+    def test_1(self) -> None:
+        watcher, event = Watcher(), Event()
+        with TemporaryDirectory() as tmp:
+            a, b = normcase(join(tmp, "a")), normcase(join(tmp, "b"))
+            for path in (a, b):
+                with open(path, "w"):
+                    pass
+
+            paths = {a, b}
+            self.assertIsNone(watcher.watch(1, paths=paths, on_change=event.set))
+            self.assertEqual(watcher.watch(1, paths=paths, on_change=event.set), set())
+
+            with open(a, "w") as fd:
+                fd.write("a")
+            self.assertTrue(event.wait(timeout=1))
+            self.assertEqual(watcher.watch(1, paths=paths, on_change=event.set), {a})
+            self.assertEqual(watcher.watch(1, paths=paths, on_change=event.set), set())
+
+    def test_2(self) -> None:
+        watcher, event = Watcher(), Event()
+        with TemporaryDirectory() as tmp:
+            a = normcase(join(tmp, "a"))
+            paths = {a}
+            watcher.watch(1, paths=paths, on_change=event.set)
+            watcher.watch(1, paths=paths, on_change=event.set)
+
+        self.assertTrue(event.wait(timeout=1))
+        self.assertIsNone(watcher.watch(1, paths=paths, on_change=event.set))
@@ -0,0 +1,30 @@
+from os.path import normcase
+from pathlib import Path
+from shutil import which
+from subprocess import check_call
+from tempfile import TemporaryDirectory
+from unittest import IsolatedAsyncioTestCase, skipUnless
+
+from ...coq.tags.crawl import crawl
+
+
+@skipUnless(which("git"), "git")
+class Crawl(IsolatedAsyncioTestCase):
+    async def test_1(self) -> None:
+        with TemporaryDirectory() as tmp:
+            cwd = Path(tmp)
+            check_call(("git", "init", "--quiet"), cwd=cwd)
+            (cwd / ".gitignore").write_text("ignored/\n")
+            (cwd / "ignored").mkdir()
+            (cwd / "ignored" / "a.py").write_text("")
+            (cwd / "b.py").write_text("")
+
+            crawled = await crawl(cwd)
+            self.assertEqual(
+                crawled, {normcase(cwd / ".gitignore"), normcase(cwd / "b.py")}
+            )
+
+    async def test_2(self) -> None:
+        with TemporaryDirectory() as tmp:
+            crawled = await crawl(Path(tmp))
+            self.assertEqual(crawled, set())
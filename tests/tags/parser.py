@@ -1,27 +1,31 @@
-from itertools import islice
 from os import linesep
 from pathlib import Path
 from shutil import get_terminal_size, which
-from unittest import IsolatedAsyncioTestCase
+from typing import MutableSequence
+from unittest import IsolatedAsyncioTestCase, TestCase, skipUnless
 
-from ...coq.consts import TMP_DIR
-from ...coq.tags.parse import parse, run
+from ...coq.tags.parse import parse, stream, unescape
+from ...coq.tags.types import Tag
 
 
+@skipUnless(which("ctags"), "ctags")
 class Parser(IsolatedAsyncioTestCase):
     async def test_1(self) -> None:
-        tag = TMP_DIR / "TAG"
-        TMP_DIR.mkdir(parents=True, exist_ok=True)
-        if not tag.exists() and (ctags := which("ctags")):
-            text = await run(Path(ctags), "--recurse")
-            tag.write_text(text)
+        ctags = which("ctags")
+        assert ctags
 
-        spec = tag.read_text()
-        parsed = parse({}, raw=spec)
+        acc: MutableSequence[Tag] = []
+        async for raw in stream(Path(ctags), "--recurse"):
+            acc.extend(parse(raw))
+
+        self.assertTrue(acc)
 
         cols, _ = get_terminal_size()
         sep = linesep + "-" * cols + linesep
-        print(
-            *islice((tag for _, _, tags in parsed.values() for tag in tags), 10),
-            sep=sep,
-        )
+        print(*acc[:10], sep=sep)
+
+
+class Unescape(TestCase):
+    def test_1(self) -> None:
+        pattern = unescape(r"/^  def f(a\/b, c\\d):$/")
+        self.assertEqual(pattern, r"def f(a/b, c\d):")